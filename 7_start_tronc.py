@@ -5,6 +5,17 @@ import re
 from datetime import datetime
 import time
 import json
+import random
+import asyncio
+import atexit
+import queue
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
 
 # 導入配置和創建函數
 from config import (
@@ -18,9 +29,58 @@ from create_04_activity import create_link_activity, create_reference_activity,
 from create_05_material import upload_material as upload_and_create_material
 from tronc_login import login_and_get_cookie, update_config
 
+# 抑制 SSL 警告
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# 同一層級並行建立的最大請求數
+CREATE_CONCURRENCY = 8
+# 共用連線池大小（需不小於並行請求數）
+HTTP_POOL_SIZE = 32
+# 批次中每累積多少筆 ID 更新才保存一次 Excel（批次結束時一定保存）
+SAVE_EVERY_ROWS = 50
+# extracted 檔名中的時間戳
+_TS_RE = re.compile(r'extracted_(\d{8}_\d{6})')
+# Cookie 字串中的 session 值
+_SESSION_RE = re.compile(r'session=([^;]+)')
+# 各層級項目建立後，需回填 ID 的子項目所屬欄位
+PARENT_COLUMNS = {'課程': '所屬課程', '章節': '所屬章節', '單元': '所屬單元'}
+# 建立時 sort 固定為 1，同層顯示順序取決於建立順序：同一父項（此欄位值相同）的項目依 Excel 順序逐一建立，不同父項之間才並行
+SIBLING_ORDER_COLUMNS = {'章節': '所屬課程ID', '單元': '所屬章節ID', '學習活動': '所屬章節ID'}
+# 建立請求遇到暫時性錯誤時自動重試：可重試的狀態碼、最多嘗試次數、退避秒數（首次/上限）
+RETRY_STATUS_CODES = (429, 503)
+RETRY_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+# 代表 Cookie 失效的狀態碼，收到時重新登入並重送一次
+AUTH_STATUS_CODES = (401, 403)
+# Cookie 驗證成功後的快取秒數，期間內不再重複呼叫 API 測試
+COOKIE_CHECK_TTL = 60
+
+# 錯誤日誌佇列，由背景執行緒寫入 JSONL 檔
+_LOG_QUEUE = queue.Queue()
+_log_writer = None
+_log_writer_lock = threading.Lock()
+
+def _log_writer_loop():
+    """背景寫入錯誤日誌，每筆一行 JSON，依日期分檔"""
+    while True:
+        log_filename, log_data = _LOG_QUEUE.get()
+        try:
+            with open(log_filename, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(log_data, ensure_ascii=False, default=str) + "\n")
+        except Exception as e:
+            print(f"❌ 記錄錯誤日誌失敗: {e}")
+        finally:
+            _LOG_QUEUE.task_done()
+
+def _flush_error_logs():
+    """程式結束前等待所有錯誤日誌寫入完成"""
+    if _log_writer is not None:
+        _LOG_QUEUE.join()
+
 def log_error(operation_type, item_name, request_params, response_data, error_msg=None):
     """
-    記錄錯誤日誌到 log 資料夾
+    記錄錯誤日誌到 log 資料夾（放入佇列後立即返回，由背景執行緒寫入）
     
     Args:
         operation_type: 操作類型 (course, module, syllabus, activity, resource)
@@ -29,21 +89,19 @@ def log_error(operation_type, item_name, request_params, response_data, error_ms
         response_data: API回應資料
         error_msg: 錯誤訊息
     """
+    global _log_writer
     try:
         # 確保 log 資料夾存在
         log_dir = "log"
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
+        os.makedirs(log_dir, exist_ok=True)
         
-        # 生成時間戳
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # 生成日誌檔案名稱
-        log_filename = f"{log_dir}/{operation_type}_error_{timestamp}.json"
+        # 同一天的錯誤寫入同一個 JSONL 檔
+        now = datetime.now()
+        log_filename = f"{log_dir}/errors_{now.strftime('%Y%m%d')}.jsonl"
         
         # 準備日誌資料
         log_data = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "operation_type": operation_type,
             "item_name": item_name,
             "request_params": request_params,
@@ -51,25 +109,77 @@ def log_error(operation_type, item_name, request_params, response_data, error_ms
             "error_msg": error_msg
         }
         
-        # 寫入日誌檔案
-        with open(log_filename, 'w', encoding='utf-8') as f:
-            json.dump(log_data, f, ensure_ascii=False, indent=2)
+        # 第一次記錄時才啟動背景寫入執行緒
+        with _log_writer_lock:
+            if _log_writer is None:
+                _log_writer = threading.Thread(target=_log_writer_loop, daemon=True)
+                _log_writer.start()
+                atexit.register(_flush_error_logs)
+        _LOG_QUEUE.put((log_filename, log_data))
         
         print(f"📝 錯誤日誌已記錄: {log_filename}")
         
     except Exception as e:
         print(f"❌ 記錄錯誤日誌失敗: {e}")
 
+def _parse_cookie(cookie_string):
+    """將 Cookie 字串轉為字典（忽略沒有 '=' 的片段）"""
+    return dict(item.split("=", 1) for item in cookie_string.split("; ") if "=" in item)
+
+def _apply_pending_updates(df, updates):
+    """將暫存的 (行索引, 欄位, 值) 依欄位分組，每個欄位只寫入一次"""
+    by_column = {}
+    for row_index, column, value in updates:
+        by_column.setdefault(column, {})[row_index] = value
+    
+    for column, values in by_column.items():
+        # 確保欄位存在（例如最後修改時間）
+        if column not in df.columns:
+            df[column] = ''
+        df.loc[list(values.keys()), column] = list(values.values())
+
 class TronClassCreator:
     def __init__(self):
         self.cookie_string = COOKIE
+        self._cookies_dict = _parse_cookie(self.cookie_string)  # 解析後的 Cookie，更新 Cookie 時才重新解析
+        self._default_headers = {
+            "Accept": "application/json, text/plain, */*",
+            "User-Agent": "Mozilla/5.0",
+            "X-Requested-With": "XMLHttpRequest"
+        }
+        self.http = self.create_http_session()  # 共用HTTP連線池，重複使用TLS連線
         self.excel_file = None
         self.result_df = None
         self.resource_df = None
+        self.sheet_names = []   # 原始工作表順序
+        self.other_sheets = {}  # Result/Resource 以外的工作表，保存時原樣寫回
+        self._rows_by_parent = {}  # 所屬欄位 → {名稱: 行索引}，於 load_data 建立
         self.api_urls = get_api_urls()
         self.error_action_policy = 'ask'  # 'ask', 'skip'
         self.skipped_items = []  # 記錄略過明細
         self.failed_items = []   # 記錄失敗明細
+        self._df_lock = threading.RLock()    # 並行建立時保護 DataFrame 讀寫
+        self._error_lock = threading.Lock()  # 並行建立時一次只處理一個錯誤詢問
+        self._pending_result_updates = []    # 待寫入 Result 表的 (行索引, 欄位, 值)
+        self._pending_resource_updates = []  # 待寫入 Resource 表的 (行索引, 欄位, 值)
+        self._pending_resource_paths = {}    # 待回填至 Result 表的 檔案路徑 → 資源ID
+        self._pending_parent_updates = []    # 待更新子項目所屬ID的 (行索引, 新ID)
+        self._dirty = False          # 是否有尚未保存到 Excel 的更新
+        self._rows_since_save = 0    # 上次保存後累積的 ID 更新筆數
+        self._ts_sec = 0
+        self._ts_str = ""
+        self._cookie_checked_at = 0.0  # 上次 Cookie 驗證成功的時間（monotonic）
+        self._cookie_ok = False        # 上次 Cookie 驗證結果
+    
+    def create_http_session(self):
+        """建立共用的 requests Session，供 Cookie 測試與各項建立請求重複使用連線"""
+        session = requests.Session()
+        session.verify = False
+        # 建立類請求不是冪等操作，連線失敗時不自動重送，交由 handle_error 處理
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
     
     def check_and_update_cookie(self, force_refresh=False):
         """檢查並更新 Cookie - 增強版本支持強制刷新"""
@@ -96,6 +206,8 @@ class TronClassCreator:
             if result:
                 cookie_string, modules = result
                 self.cookie_string = cookie_string
+                self._cookies_dict = _parse_cookie(cookie_string)
+                self.invalidate_cookie_cache()
                 print("✅ 自動登入成功，Cookie 已更新")
                 
                 # 更新配置文件
@@ -119,27 +231,29 @@ class TronClassCreator:
             print(f"❌ 登入過程發生錯誤: {e}")
             return False
     
+    def invalidate_cookie_cache(self):
+        """清除 Cookie 驗證快取，下次檢查時重新呼叫 API"""
+        self._cookie_ok = False
+        self._cookie_checked_at = 0.0
+
     def test_cookie_validity(self):
-        """測試當前 Cookie 是否有效"""
+        """測試當前 Cookie 是否有效 - 近期驗證成功時直接使用快取結果"""
+        if self._cookie_ok and time.monotonic() - self._cookie_checked_at < COOKIE_CHECK_TTL:
+            return True
+        
+        self._cookie_ok = self._probe_cookie_validity()
+        if self._cookie_ok:
+            self._cookie_checked_at = time.monotonic()
+        return self._cookie_ok
+
+    def _probe_cookie_validity(self):
+        """呼叫 API 測試當前 Cookie 是否有效"""
         try:
             # 使用一個簡單的 API 調用來測試 cookie 有效性
             # 這裡使用課程列表 API 作為測試
-            import requests
-            import urllib3
-            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-            
-            # 將 Cookie 字串轉為字典
-            cookies = dict(item.split("=", 1) for item in self.cookie_string.split("; "))
-            
-            headers = {
-                "Accept": "application/json, text/plain, */*",
-                "User-Agent": "Mozilla/5.0",
-                "X-Requested-With": "XMLHttpRequest"
-            }
-            
             # 使用課程列表 API 進行測試
             test_url = f"{BASE_URL}/api/course"
-            response = requests.get(test_url, headers=headers, cookies=cookies, verify=False, timeout=10)
+            response = self.http.get(test_url, headers=self._default_headers, cookies=self._cookies_dict, timeout=10)
             
             # 如果狀態碼是 200 或 201，表示 cookie 有效
             if response.status_code in [200, 201]:
@@ -192,7 +306,7 @@ class TronClassCreator:
     
     def extract_timestamp_for_sorting(self, filename):
         """從檔案名中提取時間戳用於排序"""
-        match = re.search(r'extracted_(\d{8}_\d{6})', filename)
+        match = _TS_RE.search(filename)
         if match:
             timestamp_str = match.group(1)
             # 將時間戳轉換為可比較的格式 (YYYYMMDD_HHMMSS)
@@ -202,7 +316,7 @@ class TronClassCreator:
     
     def extract_timestamp(self, filename):
         """從檔案名中提取時間戳用於顯示"""
-        match = re.search(r'extracted_(\d{8}_\d{6})', filename)
+        match = _TS_RE.search(filename)
         if match:
             timestamp_str = match.group(1)
             # 格式化時間戳顯示 (YYYY-MM-DD HH:MM:SS)
@@ -245,10 +359,19 @@ class TronClassCreator:
     def load_data(self):
         """載入 Excel 數據"""
         try:
-            self.result_df = pd.read_excel(self.excel_file, sheet_name='Result')
-            self.resource_df = pd.read_excel(self.excel_file, sheet_name='Resource')
+            # 活頁簿只解析一次；其他工作表原樣保留，保存時一併寫回
+            with pd.ExcelFile(self.excel_file, engine='openpyxl') as xls:
+                self.sheet_names = xls.sheet_names
+                self.result_df = xls.parse('Result')
+                self.resource_df = xls.parse('Resource')
+                self.other_sheets = {
+                    name: xls.parse(name, header=None)
+                    for name in xls.sheet_names if name not in ('Result', 'Resource')
+                }
+            self._build_parent_index()
             
-            # 確保 ID 欄位是整數類型
+            # 確保 ID 欄位是數值類型（空白與「創建失敗」等文字轉為 NaN），
+            # 之後判斷缺少 ID 只需 isna()，不必再比對空字串
             id_columns = ['ID', '所屬課程ID', '所屬章節ID', '所屬單元ID', '資源ID']
             for col in id_columns:
                 if col in self.result_df.columns:
@@ -265,6 +388,13 @@ class TronClassCreator:
             print(f"❌ 載入數據失敗: {e}")
             return False
     
+    def _build_parent_index(self):
+        """建立 所屬名稱 → 行索引，回填父級ID時不必每次掃描整個欄位（流程中名稱不會變動）"""
+        self._rows_by_parent = {
+            column: self.result_df.groupby(column, sort=False).groups
+            for column in PARENT_COLUMNS.values() if column in self.result_df.columns
+        }
+    
     def select_operation(self):
         """讓用戶選擇操作"""
         operations = [
@@ -329,45 +459,28 @@ class TronClassCreator:
         """分析即將執行的操作並顯示統計"""
         stats = {}
         
-        if operation == "建立所有課程":
-            courses = self.result_df[
-                (self.result_df['類型'] == '課程') & 
-                (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
-            ]
-            stats['課程'] = list(courses['名稱'])
-            
-        elif operation == "建立所有章節":
-            modules = self.result_df[
-                (self.result_df['類型'] == '章節') & 
-                (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
-            ]
-            stats['章節'] = list(modules['名稱'])
-            
-        elif operation == "建立所有單元":
-            syllabi = self.result_df[
-                (self.result_df['類型'] == '單元') & 
-                (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
-            ]
-            stats['單元'] = list(syllabi['名稱'])
+        # 缺少 ID 的項目只篩選一次，並直接以統計鍵分組：
+        # 學習活動用「學習活動-類型」，其他用類型，一次 groupby 取得所有名稱
+        missing = self.result_df[self.result_df['ID'].isna()]
+        stats_keys = missing['類型'].where(
+            missing['類型'] != '學習活動', '學習活動-' + missing['學習活動類型'].astype(str)
+        )
+        names_by_key = missing.groupby(stats_keys, sort=False)['名稱'].agg(list).to_dict()
+        activity_keys = [f'學習活動-{act_type}' for act_type in SUPPORTED_ACTIVITY_TYPES]
+        
+        if operation in ["建立所有課程", "建立所有章節", "建立所有單元"]:
+            item_type = operation[len("建立所有"):]
+            stats[item_type] = names_by_key.get(item_type, [])
             
         elif operation == "建立所有學習活動":
-            activities = self.result_df[
-                (self.result_df['類型'] == '學習活動') & 
-                (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
-            ]
             # 按類型分組
-            for act_type in SUPPORTED_ACTIVITY_TYPES:
-                type_activities = activities[activities['學習活動類型'] == act_type]
-                if not type_activities.empty:
-                    stats[f'學習活動-{act_type}'] = list(type_activities['名稱'])
+            for key in activity_keys:
+                if key in names_by_key:
+                    stats[key] = names_by_key[key]
                     
         elif operation == "建立特定類型學習活動":
-            activities = self.result_df[
-                (self.result_df['類型'] == '學習活動') & 
-                (self.result_df['學習活動類型'] == activity_type) &
-                (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
-            ]
-            stats[f'學習活動-{activity_type}'] = list(activities['名稱'])
+            key = f'學習活動-{activity_type}'
+            stats[key] = names_by_key.get(key, [])
             
         elif operation == "建立所有資源":
             resources = self.resource_df[
@@ -383,22 +496,9 @@ class TronClassCreator:
             if not resources.empty:
                 stats['資源'] = list(resources['檔案名稱'])
                 
-            for item_type in ['課程', '章節', '單元']:
-                items = self.result_df[
-                    (self.result_df['類型'] == item_type) & 
-                    (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
-                ]
-                if not items.empty:
-                    stats[item_type] = list(items['名稱'])
-            
-            activities = self.result_df[
-                (self.result_df['類型'] == '學習活動') & 
-                (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
-            ]
-            for act_type in SUPPORTED_ACTIVITY_TYPES:
-                type_activities = activities[activities['學習活動類型'] == act_type]
-                if not type_activities.empty:
-                    stats[f'學習活動-{act_type}'] = list(type_activities['名稱'])
+            for key in ['課程', '章節', '單元'] + activity_keys:
+                if key in names_by_key:
+                    stats[key] = names_by_key[key]
         
         return stats
     
@@ -461,50 +561,80 @@ class TronClassCreator:
                 print("⚠️ 請輸入 y 或 n，或輸入 '0' 使用預設值")
 
     def save_excel(self):
-        """保存 Excel 檔案"""
+        """保存 Excel 檔案 - 重新寫出整個活頁簿，不再以附加模式載入原檔"""
+        self.flush_updates()
+        temp_file = None
         try:
-            with pd.ExcelWriter(self.excel_file, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
-                self.result_df.to_excel(writer, sheet_name='Result', index=False)
-                self.resource_df.to_excel(writer, sheet_name='Resource', index=False)
+            # 暫存檔建在同一目錄才能以 os.replace 原子取代；以 . 開頭的隱藏檔不會被 *extracted*.xlsx 選到，
+            # 也不會與 Excel 開檔時自己建立的 ~$ 鎖定檔撞名
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(self.excel_file) or '.', prefix='.',
+                                             suffix='.xlsx', delete=False) as f:
+                temp_file = f.name
+            with self._df_lock:
+                with pd.ExcelWriter(temp_file, engine='openpyxl') as writer:
+                    for name in self.sheet_names or ['Result', 'Resource']:
+                        if name == 'Result':
+                            self.result_df.to_excel(writer, sheet_name='Result', index=False)
+                        elif name == 'Resource':
+                            self.resource_df.to_excel(writer, sheet_name='Resource', index=False)
+                        else:
+                            self.other_sheets[name].to_excel(writer, sheet_name=name, index=False, header=False)
+                # 寫完再取代原檔，避免中途失敗留下損毀的活頁簿；暫存檔權限為 0600，先沿用原檔權限
+                if os.path.exists(self.excel_file):
+                    shutil.copymode(self.excel_file, temp_file)
+                os.replace(temp_file, self.excel_file)
+                self._dirty = False
+                self._rows_since_save = 0
             print("✅ Excel 檔案已更新")
             return True
         except Exception as e:
             print(f"❌ 保存 Excel 檔案失敗: {e}")
+            # 寫入失敗時清掉暫存檔，原檔保持不變
+            if temp_file and os.path.exists(temp_file):
+                os.remove(temp_file)
             return False
     
+    def _timestamp(self):
+        """返回最後修改時間字串，秒數變化時才重新格式化"""
+        now = int(time.time())
+        if now != self._ts_sec:
+            # 先更新字串再更新秒數，其他執行緒不會讀到舊字串配新秒數
+            self._ts_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))
+            self._ts_sec = now
+        return self._ts_str
+    
+    def maybe_checkpoint(self, every=SAVE_EVERY_ROWS):
+        """累積足夠的更新筆數才保存 Excel，避免每建立一筆就重寫整個活頁簿"""
+        if self._rows_since_save >= every:
+            return self.save_excel()
+        return True
+    
+    def save_if_dirty(self):
+        """有尚未保存的更新時才保存 Excel"""
+        if self._dirty:
+            return self.save_excel()
+        return True
+    
     def update_result_id(self, row_index, new_id, status="success"):
-        """更新 Result 表中的 ID - 重構版本，使用名稱+層級的精確匹配"""
-        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        """更新 Result 表中的 ID - 先暫存，由 flush_updates 批次寫入並更新所屬ID"""
+        current_time = self._timestamp()
         
         if status == "success":
             # 確保 ID 是整數
             if new_id is not None:
                 new_id = int(new_id)
-            self.result_df.loc[row_index, 'ID'] = new_id
+            value = new_id
         else:
-            self.result_df.loc[row_index, 'ID'] = str("創建失敗，用戶已略過")
-            
-        # 確保最後修改時間欄位是字串類型
-        if '最後修改時間' not in self.result_df.columns:
-            self.result_df['最後修改時間'] = ''
-        self.result_df.loc[row_index, '最後修改時間'] = str(current_time)
-        
-        # 如果成功，更新相關項目的所屬ID - 使用層級安全的匹配邏輯
-        if status == "success" and new_id is not None:
-            item_name = self.result_df.loc[row_index, '名稱']
-            item_type = self.result_df.loc[row_index, '類型']
-            
-            if item_type == '課程':
-                # 安全更新：只更新所屬課程為此名稱的項目
-                self._safe_update_parent_id(row_index, item_name, item_type, new_id, '所屬課程', '所屬課程ID')
-                
-            elif item_type == '章節':
-                # 安全更新：只更新所屬章節為此名稱的項目，並檢查課程層級一致性
-                self._safe_update_parent_id(row_index, item_name, item_type, new_id, '所屬章節', '所屬章節ID')
-                
-            elif item_type == '單元':
-                # 安全更新：只更新所屬單元為此名稱的項目，並檢查章節和課程層級一致性
-                self._safe_update_parent_id(row_index, item_name, item_type, new_id, '所屬單元', '所屬單元ID')
+            value = str("創建失敗，用戶已略過")
+        
+        with self._df_lock:
+            self._pending_result_updates.append((row_index, 'ID', value))
+            self._dirty = True
+            self._rows_since_save += 1
+            self._pending_result_updates.append((row_index, '最後修改時間', str(current_time)))
+            # 如果成功，flush 時更新相關項目的所屬ID - 使用層級安全的匹配邏輯
+            if status == "success" and new_id is not None:
+                self._pending_parent_updates.append((row_index, new_id))
     
     def _safe_update_parent_id(self, row_index, item_name, item_type, new_id, parent_column, parent_id_column):
         """
@@ -525,7 +655,12 @@ class TronClassCreator:
         print(f"   參考行索引: {row_index}")
         
         # 構建匹配條件：名稱 + 完整層級上下文
-        base_mask = self.result_df[parent_column] == item_name
+        # 先用名稱索引取出候選列，層級條件只需在候選列中比對
+        if not self._rows_by_parent:
+            self._build_parent_index()
+        candidate_rows = self._rows_by_parent.get(parent_column, {}).get(item_name, [])
+        candidates = self.result_df.loc[candidate_rows]
+        base_mask = pd.Series(True, index=candidates.index)
         
         if item_type == '課程':
             # 課程層級：直接按名稱匹配即可
@@ -537,7 +672,7 @@ class TronClassCreator:
             course_name = reference_row.get('所屬課程', '')
             if course_name and pd.notna(course_name):
                 # 使用當前行的課程上下文進行匹配
-                course_mask = self.result_df['所屬課程'] == course_name
+                course_mask = candidates['所屬課程'] == course_name
                 final_mask = base_mask & course_mask
                 print(f"   章節層級：更新課程 '{course_name}' 中 {parent_column} = '{item_name}' 的項目")
             else:
@@ -551,14 +686,14 @@ class TronClassCreator:
             course_name = reference_row.get('所屬課程', '')
             
             # 構建層級匹配條件
-            additional_conditions = pd.Series([True] * len(self.result_df))
+            additional_conditions = pd.Series(True, index=candidates.index)
             
             if chapter_name and pd.notna(chapter_name):
-                additional_conditions &= (self.result_df['所屬章節'] == chapter_name)
+                additional_conditions &= (candidates['所屬章節'] == chapter_name)
                 print(f"   單元層級：限制章節 = '{chapter_name}'")
                 
             if course_name and pd.notna(course_name):
-                additional_conditions &= (self.result_df['所屬課程'] == course_name)
+                additional_conditions &= (candidates['所屬課程'] == course_name)
                 print(f"   單元層級：限制課程 = '{course_name}'")
                 
             final_mask = base_mask & additional_conditions
@@ -570,7 +705,7 @@ class TronClassCreator:
             print(f"   未知類型：更新所有 {parent_column} = '{item_name}' 的項目")
         
         # 執行更新前進行驗證
-        matching_items = self.result_df[final_mask]
+        matching_items = candidates[final_mask]
         
         if len(matching_items) > 0:
             print(f"   找到 {len(matching_items)} 個匹配項目需要更新")
@@ -581,10 +716,10 @@ class TronClassCreator:
                     print(f"     項目{idx+1}: {match_row.get('類型', 'Unknown')} '{match_row.get('名稱', 'Unknown')}' (行 {match_idx})")
             
             # 執行更新
-            self.result_df.loc[final_mask, parent_id_column] = new_id
+            self.result_df.loc[matching_items.index, parent_id_column] = new_id
             
             # 驗證更新結果
-            after_update = self.result_df.loc[final_mask, [parent_id_column]]
+            after_update = self.result_df.loc[matching_items.index, [parent_id_column]]
             success_count = len(after_update[after_update[parent_id_column] == new_id])
             
             if success_count == len(matching_items):
@@ -596,87 +731,86 @@ class TronClassCreator:
             print(f"   ℹ️ 沒有找到需要更新 {parent_id_column} 的項目")
     
     def update_resource_id(self, row_index, new_id, status="success"):
-        """更新 Resource 表中的 ID"""
-        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        """更新 Resource 表中的 ID - 先暫存，由 flush_updates 批次寫入"""
+        current_time = self._timestamp()
         
         if status == "success":
             # 確保 ID 是整數
             if new_id is not None:
                 new_id = int(new_id)
-            self.resource_df.loc[row_index, '資源ID'] = new_id
-            
-            # 同時更新 Result 表中相同檔案路徑的項目
-            file_path = self.resource_df.loc[row_index, '檔案路徑']
-            mask = self.result_df['檔案路徑'] == file_path
-            self.result_df.loc[mask, '資源ID'] = new_id
+            value = new_id
         else:
-            self.resource_df.loc[row_index, '資源ID'] = "創建失敗，用戶已略過"
+            value = "創建失敗，用戶已略過"
+        
+        with self._df_lock:
+            self._pending_resource_updates.append((row_index, '資源ID', value))
+            self._dirty = True
+            self._rows_since_save += 1
+            self._pending_resource_updates.append((row_index, '最後修改時間', str(current_time)))
+            if status == "success":
+                # 同時更新 Result 表中相同檔案路徑的項目
+                file_path = self.resource_df.loc[row_index, '檔案路徑']
+                self._pending_resource_paths[file_path] = new_id
+    
+    def flush_updates(self):
+        """將暫存的 ID 更新一次寫入 DataFrame（每批次結束及保存前呼叫）"""
+        with self._df_lock:
+            result_updates, self._pending_result_updates = self._pending_result_updates, []
+            resource_updates, self._pending_resource_updates = self._pending_resource_updates, []
+            resource_paths, self._pending_resource_paths = self._pending_resource_paths, {}
+            parent_updates, self._pending_parent_updates = self._pending_parent_updates, []
+            
+            _apply_pending_updates(self.result_df, result_updates)
+            _apply_pending_updates(self.resource_df, resource_updates)
             
-        # 確保最後修改時間欄位是字串類型
-        if '最後修改時間' not in self.resource_df.columns:
-            self.resource_df['最後修改時間'] = ''
-        self.resource_df.loc[row_index, '最後修改時間'] = str(current_time)
+            if resource_paths:
+                resource_ids = self.result_df['檔案路徑'].map(resource_paths)
+                mask = resource_ids.notna()
+                self.result_df.loc[mask, '資源ID'] = resource_ids[mask]
+            
+            for row_index, new_id in parent_updates:
+                item_name = self.result_df.loc[row_index, '名稱']
+                item_type = self.result_df.loc[row_index, '類型']
+                parent_column = PARENT_COLUMNS.get(item_type)
+                if parent_column:
+                    self._safe_update_parent_id(row_index, item_name, item_type, new_id, parent_column, f'{parent_column}ID')
     
     def check_missing_ids(self, operation):
         """檢查缺失的 ID 並提供預設值選項"""
         need_course_id = operation in ["建立所有章節", "建立所有單元", "建立所有學習活動"]
         need_module_id = operation in ["建立所有單元", "建立所有學習活動"]
+        if not need_course_id:
+            return True
         
-        if need_course_id:
-            # 檢查是否有空的課程ID
-            if operation == "建立所有章節":
-                items = self.result_df[
-                    (self.result_df['類型'] == '章節') & 
-                    (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
-                ]
-            elif operation == "建立所有單元":
-                items = self.result_df[
-                    (self.result_df['類型'] == '單元') & 
-                    (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
-                ]
-            else:  # 學習活動
-                items = self.result_df[
-                    (self.result_df['類型'] == '學習活動') & 
-                    (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
-                ]
-            
-            empty_course_ids = items[items['所屬課程ID'].isna() | (items['所屬課程ID'] == '')]
-            if not empty_course_ids.empty:
-                print(f"\n⚠️  發現 {len(empty_course_ids)} 個項目沒有所屬課程ID")
-                while True:
-                    print(f"是否使用預設課程ID ({COURSE_ID})？(y/n) [輸入 '0' 使用預設: y]: ", end="", flush=True)
-                    use_default = input().strip().lower()
-                    if not use_default:
-                        print("⚠️ 請輸入有效值，或輸入 '0' 使用預設值")
-                        continue
-                    if use_default == '0':
-                        use_default = 'y'
-                    if use_default in ['y', 'yes', '是']:
-                        self.result_df.loc[empty_course_ids.index, '所屬課程ID'] = int(COURSE_ID)
-                        # 確保更新後的欄位是數值類型
-                        self.result_df['所屬課程ID'] = pd.to_numeric(self.result_df['所屬課程ID'], errors='coerce')
-                        print(f"✅ 已設定預設課程ID: {COURSE_ID}")
-                        break
-                    elif use_default in ['n', 'no', '否']:
-                        print("❌ 取消操作")
-                        return False
-                    else:
-                        print("❌ 請輸入 y 或 n")
+        # 待建立項目的遮罩只計算一次，課程ID與章節ID的檢查共用
+        item_type = operation[len("建立所有"):]
+        pending = (self.result_df['類型'] == item_type) & self.result_df['ID'].isna()
+        
+        # 檢查是否有空的課程ID
+        empty_course_ids = self.result_df.index[pending & self.result_df['所屬課程ID'].isna()]
+        if not empty_course_ids.empty:
+            print(f"\n⚠️  發現 {len(empty_course_ids)} 個項目沒有所屬課程ID")
+            while True:
+                print(f"是否使用預設課程ID ({COURSE_ID})？(y/n) [輸入 '0' 使用預設: y]: ", end="", flush=True)
+                use_default = input().strip().lower()
+                if not use_default:
+                    print("⚠️ 請輸入有效值，或輸入 '0' 使用預設值")
+                    continue
+                if use_default == '0':
+                    use_default = 'y'
+                if use_default in ['y', 'yes', '是']:
+                    self.result_df.loc[empty_course_ids, '所屬課程ID'] = int(COURSE_ID)
+                    print(f"✅ 已設定預設課程ID: {COURSE_ID}")
+                    break
+                elif use_default in ['n', 'no', '否']:
+                    print("❌ 取消操作")
+                    return False
+                else:
+                    print("❌ 請輸入 y 或 n")
         
         if need_module_id:
             # 檢查是否有空的章節ID
-            if operation == "建立所有單元":
-                items = self.result_df[
-                    (self.result_df['類型'] == '單元') & 
-                    (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
-                ]
-            else:  # 學習活動
-                items = self.result_df[
-                    (self.result_df['類型'] == '學習活動') & 
-                    (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
-                ]
-            
-            empty_module_ids = items[items['所屬章節ID'].isna() | (items['所屬章節ID'] == '')]
+            empty_module_ids = self.result_df.index[pending & self.result_df['所屬章節ID'].isna()]
             if not empty_module_ids.empty:
                 print(f"\n⚠️  發現 {len(empty_module_ids)} 個項目沒有所屬章節ID")
                 while True:
@@ -688,9 +822,7 @@ class TronClassCreator:
                     if use_default == '0':
                         use_default = 'y'
                     if use_default in ['y', 'yes', '是']:
-                        self.result_df.loc[empty_module_ids.index, '所屬章節ID'] = int(MODULE_ID)
-                        # 確保更新後的欄位是數值類型
-                        self.result_df['所屬章節ID'] = pd.to_numeric(self.result_df['所屬章節ID'], errors='coerce')
+                        self.result_df.loc[empty_module_ids, '所屬章節ID'] = int(MODULE_ID)
                         print(f"✅ 已設定預設章節ID: {MODULE_ID}")
                         break
                     elif use_default in ['n', 'no', '否']:
@@ -701,10 +833,54 @@ class TronClassCreator:
         
         return True
     
+    def _call_with_retry(self, item_name, create_func, **kwargs):
+        """呼叫建立 API；暫時性錯誤以指數退避（含抖動）自動重試，401/403 時重新登入後再試一次，仍失敗才交給 handle_error"""
+        delay = RETRY_BASE_DELAY
+        attempt = 0
+        relogged_in = False
+        while True:
+            attempt += 1
+            result = create_func(**kwargs)
+            # 資源已在伺服器建立後才失敗（上傳檔案步驟），重送會產生重複資源
+            if result.get('success') or result.get('step') == 'upload':
+                return result
+            
+            status_code = result.get('status_code')
+            if status_code in AUTH_STATUS_CODES and not relogged_in:
+                relogged_in = True
+                if self._relogin_after_auth_error(item_name, kwargs['cookie_string'], f"HTTP {status_code}"):
+                    kwargs['cookie_string'] = self.cookie_string
+                    print(f"🔁 已重新登入，重新建立 '{item_name}'")
+                    continue
+                return result
+            
+            if status_code not in RETRY_STATUS_CODES or attempt >= RETRY_MAX_ATTEMPTS:
+                return result
+            
+            wait = min(delay, RETRY_MAX_DELAY) + random.random() * 0.2
+            print(f"⏳ '{item_name}' 暫時無法建立 (HTTP {status_code})，{wait:.1f} 秒後重試 ({attempt}/{RETRY_MAX_ATTEMPTS - 1})")
+            time.sleep(wait)
+            delay *= 2
+    
+    def _relogin_after_auth_error(self, item_name, used_cookie, error_msg):
+        """請求回應 401/403 時重新登入；並行時只由第一個執行緒登入，其他執行緒沿用新 Cookie"""
+        with self._error_lock:
+            if self.cookie_string != used_cookie:
+                return True
+            self.invalidate_cookie_cache()
+            return self.handle_cookie_authentication_error(item_name, error_msg)
+    
     def handle_error(self, item_name, error_msg, response_data=None):
+        """處理錯誤 - 並行建立時逐一處理，避免詢問與重新登入互相穿插"""
+        with self._error_lock:
+            return self._handle_error(item_name, error_msg, response_data)
+
+    def _handle_error(self, item_name, error_msg, response_data=None):
         """處理錯誤"""
         # 檢查是否為認證錯誤
         if self.is_authentication_error(error_msg):
+            # 快取的驗證結果已不可信，下次檢查需重新呼叫 API
+            self.invalidate_cookie_cache()
             if self.handle_cookie_authentication_error(item_name, error_msg):
                 print("認證已恢復，請手動重新執行操作")
             return False
@@ -818,7 +994,8 @@ class TronClassCreator:
     
     def create_single_course(self, row_index):
         """建立單一課程"""
-        row = self.result_df.loc[row_index]
+        with self._df_lock:
+            row = self.result_df.loc[row_index]
         course_name = row['名稱']
         
         print(f"📝 正在建立課程: {course_name}")
@@ -830,10 +1007,12 @@ class TronClassCreator:
         }
         
         try:
-            result = create_course(
+            result = self._call_with_retry(
+                course_name, create_course,
                 cookie_string=self.cookie_string,
                 url=self.api_urls['COURSE_CREATE_URL'],
-                course_name=course_name
+                course_name=course_name,
+                session=self.http
             )
             
             if result['success']:
@@ -879,7 +1058,8 @@ class TronClassCreator:
     
     def create_single_module(self, row_index):
         """建立單一章節"""
-        row = self.result_df.loc[row_index]
+        with self._df_lock:
+            row = self.result_df.loc[row_index]
         module_name = row['名稱']
         course_id = row['所屬課程ID']
         
@@ -896,11 +1076,13 @@ class TronClassCreator:
         }
         
         try:
-            result = create_module(
+            result = self._call_with_retry(
+                module_name, create_module,
                 cookie_string=self.cookie_string,
                 url=module_url,
                 module_name=module_name,
-                course_id=int(course_id) if pd.notna(course_id) and course_id != '' else None
+                course_id=int(course_id) if pd.notna(course_id) and course_id != '' else None,
+                session=self.http
             )
             
             if result['success']:
@@ -945,7 +1127,8 @@ class TronClassCreator:
     
     def create_single_syllabus(self, row_index):
         """建立單一單元"""
-        row = self.result_df.loc[row_index]
+        with self._df_lock:
+            row = self.result_df.loc[row_index]
         summary = row['名稱']
         module_id = row['所屬章節ID']
         course_id = row['所屬課程ID']
@@ -961,12 +1144,14 @@ class TronClassCreator:
         }
         
         try:
-            result = create_syllabus(
+            result = self._call_with_retry(
+                summary, create_syllabus,
                 cookie_string=self.cookie_string,
                 url=self.api_urls['SYLLABUS_CREATE_URL'],
                 module_id=int(module_id) if pd.notna(module_id) and module_id != '' else None,
                 summary=summary,
-                course_id=int(course_id) if pd.notna(course_id) and course_id != '' else None
+                course_id=int(course_id) if pd.notna(course_id) and course_id != '' else None,
+                session=self.http
             )
             
             if result['success']:
@@ -1011,7 +1196,8 @@ class TronClassCreator:
     
     def create_single_activity(self, row_index):
             """建立單一學習活動"""
-            row = self.result_df.loc[row_index]
+            with self._df_lock:
+                row = self.result_df.loc[row_index]
             title = row['名稱']
             activity_type = row['學習活動類型']
             module_id = row['所屬章節ID']
@@ -1076,13 +1262,15 @@ class TronClassCreator:
                         "activity_type": "web_link"
                     }
                     
-                    result = create_link_activity(
+                    result = self._call_with_retry(
+                        title, create_link_activity,
                         cookie_string=self.cookie_string,
                         url=activity_url,
                         title=title,
                         link_url=str(link_url),
                         module_id=int(module_id) if pd.notna(module_id) and module_id != '' else None,
-                        syllabus_id=valid_syllabus_id
+                        syllabus_id=valid_syllabus_id,
+                        session=self.http
                     )
                     
                 elif api_type == 'online_video':
@@ -1112,13 +1300,15 @@ class TronClassCreator:
                         "activity_type": "online_video"
                     }
                     
-                    result = create_online_video_activity(
+                    result = self._call_with_retry(
+                        title, create_online_video_activity,
                         cookie_string=self.cookie_string,
                         url=activity_url,
                         title=title,
                         link=str(link),
                         module_id=int(module_id) if pd.notna(module_id) and module_id != '' else None,
-                        syllabus_id=valid_syllabus_id
+                        syllabus_id=valid_syllabus_id,
+                        session=self.http
                     )
                     
                 elif api_type in ['video', 'audio']:
@@ -1154,24 +1344,28 @@ class TronClassCreator:
                     }
                     
                     if api_type == 'video':
-                        result = create_video_activity(
+                        result = self._call_with_retry(
+                            title, create_video_activity,
                             cookie_string=self.cookie_string,
                             url=activity_url,
                             title=title,
                             upload_id=int(upload_id),
                             upload_name=upload_name,
                             module_id=int(module_id) if pd.notna(module_id) and module_id != '' else None,
-                            syllabus_id=valid_syllabus_id
+                            syllabus_id=valid_syllabus_id,
+                            session=self.http
                         )
                     else:  # audio - 注意：音訊功能尚未驗證支持
-                        result = create_audio_activity(
+                        result = self._call_with_retry(
+                            title, create_audio_activity,
                             cookie_string=self.cookie_string,
                             url=activity_url,
                             title=title,
                             upload_id=int(upload_id),
                             upload_name=upload_name,
                             module_id=int(module_id) if pd.notna(module_id) and module_id != '' else None,
-                            syllabus_id=valid_syllabus_id
+                            syllabus_id=valid_syllabus_id,
+                            session=self.http
                         )
                         
                 else:
@@ -1206,14 +1400,16 @@ class TronClassCreator:
                         "activity_type": "material"
                     }
                     
-                    result = create_reference_activity(
+                    result = self._call_with_retry(
+                        title, create_reference_activity,
                         cookie_string=self.cookie_string,
                         url=activity_url,
                         title=title,
                         module_id=int(module_id) if pd.notna(module_id) and module_id != '' else None,
                         syllabus_id=valid_syllabus_id,
                         upload_id=int(upload_id),
-                        upload_name=upload_name
+                        upload_name=upload_name,
+                        session=self.http
                     )
                 
                 # 處理結果
@@ -1258,15 +1454,15 @@ class TronClassCreator:
     
     def create_single_resource(self, row_index):
         """建立單一資源"""
-        row = self.resource_df.loc[row_index]
+        with self._df_lock:
+            row = self.resource_df.loc[row_index]
         title = row['檔案名稱']
         file_path = row['檔案路徑']
         
         print(f"📝 正在建立資源: {title}")
         
         # 從完整 cookie 字串中提取 session
-        import re
-        m = re.search(r'session=([^;]+)', self.cookie_string)
+        m = _SESSION_RE.search(self.cookie_string)
         if not m:
             print(f"❌ 無法從 cookie 中提取 session")
             return False
@@ -1280,11 +1476,13 @@ class TronClassCreator:
         }
         
         try:
-            result = upload_and_create_material(
+            result = self._call_with_retry(
+                title, upload_and_create_material,
                 cookie_string=self.cookie_string,
                 filename=file_path,
                 parent_id=0,
-                file_type="resource"
+                file_type="resource",
+                session=self.http
             )
             
             if result['success']:
@@ -1459,6 +1657,69 @@ class TronClassCreator:
         print(f"\n🎉 資源ID更新完成！")
         return True
     
+    async def _run_batch_async(self, create_func, chains):
+        """以 asyncio 並行建立同一層級的項目；同一條 chain 內依序建立，單一項目仍沿用原本的建立與錯誤處理流程"""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(CREATE_CONCURRENCY)
+        executor = ThreadPoolExecutor(max_workers=CREATE_CONCURRENCY)
+        stop_event = threading.Event()
+
+        def create_one(idx):
+            # 用戶選擇終止後，尚未送出的項目不再建立
+            if stop_event.is_set():
+                return None
+            if create_func(idx):
+                time.sleep(SLEEP_SECONDS)
+                return True
+            stop_event.set()
+            return False
+
+        success_count = 0
+        total_count = 0
+
+        async def run_chain(chain):
+            nonlocal success_count, total_count
+            for idx in chain:
+                # 每個項目各自取得並行名額，前一個完成後才建立下一個，保持 Excel 順序
+                async with semaphore:
+                    success = await loop.run_in_executor(executor, create_one, idx)
+                if success is None:
+                    return
+                total_count += 1
+                if not success:
+                    return
+                success_count += 1
+                # 定期保存，中斷時最多只損失最後一段的進度
+                self.maybe_checkpoint()
+
+        try:
+            # 依 chain 的先後順序建立 task，讓排在前面的項目先取得並行名額
+            await asyncio.gather(*(run_chain(chain) for chain in chains))
+        finally:
+            executor.shutdown(wait=True)
+            # 本批次的 ID 須在下一層級開始前寫回，並保存剩餘的更新
+            self.flush_updates()
+            self.save_if_dirty()
+
+        return success_count, total_count, stop_event.is_set()
+
+    def run_batch(self, create_func, indices, order_column=None):
+        """並行建立一批項目，返回 (成功數, 嘗試數, 是否被用戶終止)
+
+        指定 order_column 時，該欄位值相同（同一父項）的項目依 Excel 順序逐一建立，不同父項之間並行；
+        未指定時每個項目各自並行
+        """
+        indices = list(indices)
+        if order_column is None:
+            chains = [[idx] for idx in indices]
+        else:
+            grouped = {}
+            for idx, parent in zip(indices, self.result_df.loc[indices, order_column]):
+                # 空值統一歸為同一組，NaN 彼此不相等，不能直接作為字典鍵
+                grouped.setdefault(None if pd.isna(parent) else parent, []).append(idx)
+            chains = list(grouped.values())
+        return asyncio.run(self._run_batch_async(create_func, chains))
+
     def execute_operation(self, operation, activity_type=None):
         """執行選定的操作"""
         # 如果是更新資源ID操作，直接呼叫專用函數
@@ -1474,69 +1735,40 @@ class TronClassCreator:
                 self.resource_df['資源ID'].isna() | (self.resource_df['資源ID'] == '')
             ]
             
-            for idx in resources.index:
-                total_count += 1
-                if self.create_single_resource(idx):
-                    success_count += 1
-                    time.sleep(SLEEP_SECONDS)
-                    # 每次創建後保存
-                    self.save_excel()
-                else:
-                    break  # 用戶選擇終止
+            success_count, total_count, _ = self.run_batch(self.create_single_resource, resources.index)
                     
         elif operation == "建立所有課程":
             # 建立所有課程
             courses = self.result_df[
                 (self.result_df['類型'] == '課程') & 
-                (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
+                self.result_df['ID'].isna()
             ]
             
-            for idx in courses.index:
-                total_count += 1
-                if self.create_single_course(idx):
-                    success_count += 1
-                    time.sleep(SLEEP_SECONDS)
-                    self.save_excel()
-                else:
-                    break
+            success_count, total_count, _ = self.run_batch(self.create_single_course, courses.index)
                     
         elif operation == "建立所有章節":
             # 建立所有章節
             modules = self.result_df[
                 (self.result_df['類型'] == '章節') & 
-                (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
+                self.result_df['ID'].isna()
             ]
             
-            for idx in modules.index:
-                total_count += 1
-                if self.create_single_module(idx):
-                    success_count += 1
-                    time.sleep(SLEEP_SECONDS)
-                    self.save_excel()
-                else:
-                    break
+            success_count, total_count, _ = self.run_batch(self.create_single_module, modules.index, SIBLING_ORDER_COLUMNS['章節'])
                     
         elif operation == "建立所有單元":
             # 建立所有單元
             syllabi = self.result_df[
                 (self.result_df['類型'] == '單元') & 
-                (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
+                self.result_df['ID'].isna()
             ]
             
-            for idx in syllabi.index:
-                total_count += 1
-                if self.create_single_syllabus(idx):
-                    success_count += 1
-                    time.sleep(SLEEP_SECONDS)
-                    self.save_excel()
-                else:
-                    break
+            success_count, total_count, _ = self.run_batch(self.create_single_syllabus, syllabi.index, SIBLING_ORDER_COLUMNS['單元'])
                     
         elif operation == "建立所有學習活動":
             # 先檢查參考檔案類型的活動是否需要上傳資源
             activities = self.result_df[
                 (self.result_df['類型'] == '學習活動') & 
-                (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
+                self.result_df['ID'].isna()
             ]
             
             # 檢查參考檔案活動（需要上傳資源的活動）
@@ -1584,7 +1816,8 @@ class TronClassCreator:
                     if confirm_upload not in ['y', 'yes', '是']:
                         return 0, 0
                     
-                    # 上傳缺失的資源
+                    # 先在 resource 表中備妥要上傳的列，再並行上傳
+                    resource_indices = []
                     for file_path, activity_name in missing_resources:
                         # 檢查是否已存在於 resource 表中
                         existing = self.resource_df[self.resource_df['檔案路徑'] == file_path]
@@ -1602,40 +1835,27 @@ class TronClassCreator:
                             }
                             resource_idx = len(self.resource_df)
                             self.resource_df.loc[resource_idx] = new_row
-                        
-                        if self.create_single_resource(resource_idx):
-                            time.sleep(SLEEP_SECONDS)
-                            self.save_excel()
-                        else:
-                            print("❌ 資源上傳失敗，終止操作")
-                            return 0, 0
+                        if resource_idx not in resource_indices:
+                            resource_indices.append(resource_idx)
+                    
+                    # 上傳缺失的資源（批次結束時已寫回資源ID，學習活動可直接讀取）
+                    _, _, stopped = self.run_batch(self.create_single_resource, resource_indices)
+                    if stopped:
+                        print("❌ 資源上傳失敗，終止操作")
+                        return 0, 0
             
             # 建立學習活動
-            for idx in activities.index:
-                total_count += 1
-                if self.create_single_activity(idx):
-                    success_count += 1
-                    time.sleep(SLEEP_SECONDS)
-                    self.save_excel()
-                else:
-                    break
+            success_count, total_count, _ = self.run_batch(self.create_single_activity, activities.index, SIBLING_ORDER_COLUMNS['學習活動'])
                     
         elif operation == "建立特定類型學習活動":
             # 建立特定類型學習活動
             activities = self.result_df[
                 (self.result_df['類型'] == '學習活動') & 
                 (self.result_df['學習活動類型'] == activity_type) &
-                (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
+                self.result_df['ID'].isna()
             ]
             
-            for idx in activities.index:
-                total_count += 1
-                if self.create_single_activity(idx):
-                    success_count += 1
-                    time.sleep(SLEEP_SECONDS)
-                    self.save_excel()
-                else:
-                    break
+            success_count, total_count, _ = self.run_batch(self.create_single_activity, activities.index, SIBLING_ORDER_COLUMNS['學習活動'])
                     
         elif operation == "建立文件內所有元素":
             # 先建立所有資源
@@ -1644,22 +1864,23 @@ class TronClassCreator:
             ]
             
             print(f"\n🔄 第1步：建立所有資源 ({len(resources)} 個)")
-            for idx in resources.index:
-                total_count += 1
-                if self.create_single_resource(idx):
-                    success_count += 1
-                    time.sleep(SLEEP_SECONDS)
-                    self.save_excel()
-                else:
-                    return success_count, total_count
+            success_count, total_count, stopped = self.run_batch(self.create_single_resource, resources.index)
+            if stopped:
+                return success_count, total_count
             
             # 按順序建立課程結構元素
             structure_types = ['課程', '章節', '單元', '學習活動']
+            create_funcs = {
+                '課程': self.create_single_course,
+                '章節': self.create_single_module,
+                '單元': self.create_single_syllabus,
+                '學習活動': self.create_single_activity,
+            }
             
             for i, item_type in enumerate(structure_types, 2):
                 items = self.result_df[
                     (self.result_df['類型'] == item_type) & 
-                    (self.result_df['ID'].isna() | (self.result_df['ID'] == ''))
+                    self.result_df['ID'].isna()
                 ]
                 
                 if items.empty:
@@ -1667,24 +1888,14 @@ class TronClassCreator:
                     
                 print(f"\n🔄 第{i}步：建立所有{item_type} ({len(items)} 個)")
                 
-                for idx in items.index:
-                    total_count += 1
-                    
-                    if item_type == '課程':
-                        success = self.create_single_course(idx)
-                    elif item_type == '章節':
-                        success = self.create_single_module(idx)
-                    elif item_type == '單元':
-                        success = self.create_single_syllabus(idx)
-                    else:  # 學習活動
-                        success = self.create_single_activity(idx)
-                    
-                    if success:
-                        success_count += 1
-                        time.sleep(SLEEP_SECONDS)
-                        self.save_excel()
-                    else:
-                        return success_count, total_count
+                # 同一層級並行建立，下一層級需等本層級的 ID 回填後才開始
+                level_success, level_total, stopped = self.run_batch(
+                    create_funcs[item_type], items.index, SIBLING_ORDER_COLUMNS.get(item_type)
+                )
+                success_count += level_success
+                total_count += level_total
+                if stopped:
+                    return success_count, total_count
         
         return success_count, total_count
     
@@ -1693,10 +1904,11 @@ class TronClassCreator:
         print("🚀 TronClass 自動建立工具")
         print("=" * 50)
         
-        # 0. 檢查並更新 Cookie
-        if not self.check_and_update_cookie():
-            print("❌ Cookie 檢查失敗，無法繼續")
-            return
+        # 0. 不預先測試 Cookie，第一次請求回應 401/403 時才重新登入；尚未登入過才直接登入
+        if not _SESSION_RE.search(self.cookie_string):
+            if not self.check_and_update_cookie(force_refresh=True):
+                print("❌ 登入失敗，無法繼續")
+                return
         
         # 1. 選擇檔案
         self.excel_file = self.select_file()
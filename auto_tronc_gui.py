@@ -746,11 +746,11 @@ class AutoTroncGUI:
         else:
             self.log_message(f"❌ Excel文件不存在: {excel_path}")
             
-        # 檢查腳本文件
-        missing_scripts = []
-        for step in self.workflow_steps:
-            if not os.path.exists(step['script']):
-                missing_scripts.append(step['script'])
+        # 檢查腳本文件：腳本都在當前目錄，讀一次目錄列表即可
+        with os.scandir('.') as entries:
+            present = {entry.name for entry in entries}
+        missing_scripts = [step['script'] for step in self.workflow_steps
+                           if step['script'] not in present]
                 
         if missing_scripts:
             self.log_message(f"⚠️ 缺少腳本文件: {', '.join(missing_scripts)}")
@@ -9,7 +9,7 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 from datetime import date
 
-def create_course(cookie_string: str, url: str, course_name: str, start_date: str | None = None) -> dict:
+def create_course(cookie_string: str, url: str, course_name: str, start_date: str | None = None, session=None) -> dict:
     """
     建立課程並回傳課程資訊
     參數:
@@ -17,6 +17,7 @@ def create_course(cookie_string: str, url: str, course_name: str, start_date: st
         url: 創建課程 API 的完整 URL（例如 https://example.com/api/course）
         course_name: 課程名稱
         start_date: 開課日期，格式為 yyyy-mm-dd
+        session: 可選的 requests.Session，傳入時重複使用連線（keep-alive）
     回傳:
         dict，包含課程名稱與課程 ID（若失敗則回傳錯誤訊息）
     """
@@ -56,8 +57,9 @@ def create_course(cookie_string: str, url: str, course_name: str, start_date: st
         "enrollment_type": "open"
     }
 
+    http = session or requests
     try:
-        response = requests.post(url, headers=headers, cookies=cookies, json=course_data, verify=False)
+        response = http.post(url, headers=headers, cookies=cookies, json=course_data, verify=False)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -4,7 +4,7 @@ import urllib3
 # 抑制 SSL 警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-def create_module(cookie_string: str, url: str, module_name: str, course_id: int | None = None, sort: int = 1) -> dict:
+def create_module(cookie_string: str, url: str, module_name: str, course_id: int | None = None, sort: int = 1, session=None) -> dict:
     """
     建立章節（module）並回傳 JSON 結果
     參數:
@@ -12,6 +12,7 @@ def create_module(cookie_string: str, url: str, module_name: str, course_id: int
         url: 章節建立 API 的完整 URL（如 https://xxx/api/course/16390/module）
         module_name: 章節名稱
         sort: 排序順序（整數）
+        session: 可選的 requests.Session，傳入時重複使用連線（keep-alive）
     回傳:
         dict，包含是否成功、章節 ID、章節名稱、課程 ID，或錯誤資訊
     """
@@ -38,8 +39,9 @@ def create_module(cookie_string: str, url: str, module_name: str, course_id: int
     if course_id is not None:
         data["course_id"] = course_id
 
+    http = session or requests
     try:
-        response = requests.post(url, headers=headers, cookies=cookies, json=data, verify=False)
+        response = http.post(url, headers=headers, cookies=cookies, json=data, verify=False)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -4,7 +4,7 @@ import urllib3
 # 抑制 SSL 警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-def create_syllabus(cookie_string: str, url: str, module_id: int, summary: str, course_id: int | None = None, sort: int = 1) -> dict:
+def create_syllabus(cookie_string: str, url: str, module_id: int, summary: str, course_id: int | None = None, sort: int = 1, session=None) -> dict:
     """
     建立單元（syllabus）並回傳 JSON 結果
     參數:
@@ -13,6 +13,7 @@ def create_syllabus(cookie_string: str, url: str, module_id: int, summary: str,
         module_id: 章節 ID（單元所屬章節）
         summary: 單元簡述或標題
         sort: 單元排序（預設 1）
+        session: 可選的 requests.Session，傳入時重複使用連線（keep-alive）
     回傳:
         dict，包含單元 ID、名稱、所屬章節 ID，或錯誤資訊
     """
@@ -41,8 +42,9 @@ def create_syllabus(cookie_string: str, url: str, module_id: int, summary: str,
     if course_id is not None:
         data["course_id"] = course_id
 
+    http = session or requests
     try:
-        response = requests.post(url, headers=headers, cookies=cookies, json=data, verify=False)
+        response = http.post(url, headers=headers, cookies=cookies, json=data, verify=False)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -21,7 +21,7 @@ def _build_headers(cookie_string: str, url: str):
 
 
 def create_link_activity(cookie_string: str, url: str, title: str, link_url: str,
-                         module_id: int | None = None, syllabus_id: int | None = None, sort: int = 1) -> dict:
+                         module_id: int | None = None, syllabus_id: int | None = None, sort: int = 1, session=None) -> dict:
     """
     建立「線上連結」學習活動
     """
@@ -57,8 +57,9 @@ def create_link_activity(cookie_string: str, url: str, title: str, link_url: str
     if syllabus_id is not None:
         payload["syllabus_id"] = syllabus_id
 
+    http = session or requests
     try:
-        response = requests.post(url, headers=headers, cookies=cookies, json=payload, verify=False)
+        response = http.post(url, headers=headers, cookies=cookies, json=payload, verify=False)
     except Exception as e:
         return {"success": False, "error": str(e), "request_payload": payload}
 
@@ -80,7 +81,7 @@ def create_link_activity(cookie_string: str, url: str, title: str, link_url: str
 
 def create_reference_activity(cookie_string: str, url: str, title: str, module_id: int | None = None,
                               syllabus_id: int | None = None, description: str = " ",
-                              upload_id: int | None = None, upload_name: str = "", sort: int = 1) -> dict:
+                              upload_id: int | None = None, upload_name: str = "", sort: int = 1, session=None) -> dict:
     """
     建立「參考資料」學習活動
     參數:
@@ -133,8 +134,9 @@ def create_reference_activity(cookie_string: str, url: str, title: str, module_i
     if syllabus_id is not None:
         payload["syllabus_id"] = syllabus_id
 
+    http = session or requests
     try:
-        response = requests.post(url, headers=headers, cookies=cookies, json=payload, verify=False)
+        response = http.post(url, headers=headers, cookies=cookies, json=payload, verify=False)
     except Exception as e:
         return {"success": False, "error": str(e), "request_payload": payload}
 
@@ -157,7 +159,7 @@ def create_reference_activity(cookie_string: str, url: str, title: str, module_i
 def create_video_activity(cookie_string: str, url: str, title: str, upload_id: int,
                          upload_name: str, module_id: int | None = None, 
                          syllabus_id: int | None = None, sort: int = 1,
-                         completion_criterion_value: int = 80, submit_times: int = 1) -> dict:
+                         completion_criterion_value: int = 80, submit_times: int = 1, session=None) -> dict:
     """
     建立「影音教材_影片」學習活動（使用上傳檔案）
     
@@ -221,8 +223,9 @@ def create_video_activity(cookie_string: str, url: str, title: str, upload_id: i
     if syllabus_id is not None:
         payload["syllabus_id"] = syllabus_id
 
+    http = session or requests
     try:
-        response = requests.post(url, headers=headers, cookies=cookies, json=payload, verify=False)
+        response = http.post(url, headers=headers, cookies=cookies, json=payload, verify=False)
     except Exception as e:
         return {"success": False, "error": str(e), "request_payload": payload}
 
@@ -245,7 +248,7 @@ def create_video_activity(cookie_string: str, url: str, title: str, upload_id: i
 def create_audio_activity(cookie_string: str, url: str, title: str, upload_id: int,
                          upload_name: str, module_id: int | None = None, 
                          syllabus_id: int | None = None, sort: int = 1,
-                         completion_criterion_value: int = 80, submit_times: int = 1) -> dict:
+                         completion_criterion_value: int = 80, submit_times: int = 1, session=None) -> dict:
     """
     建立「影音教材_音訊」學習活動（使用上傳檔案）
     
@@ -309,8 +312,9 @@ def create_audio_activity(cookie_string: str, url: str, title: str, upload_id: i
     if syllabus_id is not None:
         payload["syllabus_id"] = syllabus_id
 
+    http = session or requests
     try:
-        response = requests.post(url, headers=headers, cookies=cookies, json=payload, verify=False)
+        response = http.post(url, headers=headers, cookies=cookies, json=payload, verify=False)
     except Exception as e:
         return {"success": False, "error": str(e), "request_payload": payload}
 
@@ -331,7 +335,7 @@ def create_audio_activity(cookie_string: str, url: str, title: str, upload_id: i
 
 
 def create_video_link_activity(cookie_string: str, url: str, title: str, video_link_url: str,
-                              module_id: int | None = None, syllabus_id: int | None = None, sort: int = 1) -> dict:
+                              module_id: int | None = None, syllabus_id: int | None = None, sort: int = 1, session=None) -> dict:
     """
     建立「影音教材_影音連結」學習活動
     """
@@ -349,8 +353,9 @@ def create_video_link_activity(cookie_string: str, url: str, title: str, video_l
     if syllabus_id is not None:
         payload["syllabus_id"] = syllabus_id
 
+    http = session or requests
     try:
-        response = requests.post(url, headers=headers, cookies=cookies, json=payload, verify=False)
+        response = http.post(url, headers=headers, cookies=cookies, json=payload, verify=False)
     except Exception as e:
         return {"success": False, "error": str(e), "request_payload": payload}
 
@@ -371,7 +376,7 @@ def create_video_link_activity(cookie_string: str, url: str, title: str, video_l
 
 
 def create_online_video_activity(cookie_string: str, url: str, title: str, link: str,
-                                 module_id: int | None = None, syllabus_id: int | None = None, sort: int = 1, description: str = "", completion_criterion_value=None, submit_times=None) -> dict:
+                                 module_id: int | None = None, syllabus_id: int | None = None, sort: int = 1, description: str = "", completion_criterion_value=None, submit_times=None, session=None) -> dict:
     """
     建立「影音教材_影音連結」學習活動（type: online_video）
     """
@@ -411,8 +416,9 @@ def create_online_video_activity(cookie_string: str, url: str, title: str, link:
     if syllabus_id is not None:
         payload["syllabus_id"] = syllabus_id
 
+    http = session or requests
     try:
-        response = requests.post(url, headers=headers, cookies=cookies, json=payload, verify=False)
+        response = http.post(url, headers=headers, cookies=cookies, json=payload, verify=False)
     except Exception as e:
         return {"success": False, "error": str(e), "request_payload": payload}
 
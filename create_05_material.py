@@ -6,12 +6,16 @@ from config import get_api_urls
 # 抑制 SSL 警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-def upload_material(cookie_string, filename, parent_id=0, file_type="resource"):
+def upload_material(cookie_string, filename, parent_id=0, file_type="resource", session=None):
     """
     新版 TronClass 上傳資源：
     1. POST /api/uploads 取得 upload_url 和 material_id
     2. PUT 檔案到 upload_url
+    
+    可傳入 requests.Session 以重複使用連線（keep-alive），未傳入時使用 requests 模組
+    失敗時返回的字典包含 status_code，呼叫端可據此判斷是否為認證失效（401/403）
     """
+    http = session or requests
     file_path = os.path.abspath(filename)
     file_size = os.path.getsize(file_path)
     
@@ -34,7 +38,7 @@ def upload_material(cookie_string, filename, parent_id=0, file_type="resource"):
         "embed_material_type": "",
         "is_marked_attachment": False
     }
-    upload_info = requests.post(
+    upload_info = http.post(
         upload_url,
         json=payload,
         cookies=cookies,
@@ -43,14 +47,14 @@ def upload_material(cookie_string, filename, parent_id=0, file_type="resource"):
     print("DEBUG: upload_info.status_code =", upload_info.status_code)
     print("DEBUG: upload_info.text =", upload_info.text)
     if upload_info.status_code not in [200, 201]:
-        return {"success": False, "step": "notify", "error": upload_info.text}
+        return {"success": False, "step": "notify", "error": upload_info.text, "status_code": upload_info.status_code}
     upload_info = upload_info.json()
     upload_url = upload_info["upload_url"]
     material_id = upload_info["id"]
     
     # 步驟二：POST 檔案內容
     with open(file_path, "rb") as f:
-        response = requests.post(
+        response = http.post(
             upload_url,
             files={'file': (os.path.basename(file_path), f)},
             verify=False
@@ -58,7 +62,7 @@ def upload_material(cookie_string, filename, parent_id=0, file_type="resource"):
     print("DEBUG: post response.status_code =", response.status_code)
     print("DEBUG: post response.text =", response.text)
     if response.status_code != 200:
-        return {"success": False, "step": "upload", "error": response.text, "material_id": material_id}
+        return {"success": False, "step": "upload", "error": response.text, "material_id": material_id, "status_code": response.status_code}
     return {"success": True, "material_id": material_id}
 
 # 主程式測試區塊
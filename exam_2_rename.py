@@ -4,6 +4,7 @@ import glob
 import xml.etree.ElementTree as ET
 import re
 from datetime import datetime
+from sub_chinese_numbers import convert_chinese_numbers_to_digits
 try:
     import pandas as pd
 except ImportError:
@@ -18,55 +19,6 @@ except ImportError:
     os.system("pip3 install natsort")
     import natsort
 
-def convert_chinese_numbers_to_digits(text):
-    """將中文數字轉換為阿拉伯數字以便自然排序"""
-    if not isinstance(text, str):
-        return str(text)
-    
-    # 中文數字對應表
-    chinese_digits = {
-        '零': '0', '一': '1', '二': '2', '三': '3', '四': '4', '五': '5',
-        '六': '6', '七': '7', '八': '8', '九': '9', '十': '10',
-        '〇': '0', '壹': '1', '貳': '2', '參': '3', '肆': '4', '伍': '5',
-        '陸': '6', '柒': '7', '捌': '8', '玖': '9', '拾': '10'
-    }
-    
-    result = text
-    
-    # 處理複雜的十位數字模式（如：十一、二十三、九十九等）
-    import re
-    
-    # 處理 "十X" 模式（如：十一、十二...十九）
-    def replace_shi_x(match):
-        x = match.group(1)
-        if x in chinese_digits:
-            return '1' + chinese_digits[x]
-        return match.group(0)
-    
-    result = re.sub(r'十([一二三四五六七八九壹貳參肆伍陸柒捌玖])', replace_shi_x, result)
-    
-    # 處理 "X十Y" 模式（如：二十一、三十五、九十九等）
-    def replace_x_shi_y(match):
-        x = match.group(1)
-        y = match.group(2) if match.group(2) else ''
-        x_digit = chinese_digits.get(x, x)
-        y_digit = chinese_digits.get(y, y) if y else '0'
-        if y:
-            return x_digit + y_digit
-        else:
-            return x_digit + '0'
-    
-    result = re.sub(r'([一二三四五六七八九壹貳參肆伍陸柒捌玖])十([一二三四五六七八九壹貳參肆伍陸柒捌玖]?)', replace_x_shi_y, result)
-    
-    # 處理單獨的 "十"
-    result = result.replace('十', '10')
-    
-    # 處理其他單個中文數字
-    for chinese, digit in chinese_digits.items():
-        result = result.replace(chinese, digit)
-    
-    return result
-
 def find_exam_folders():
     """尋找所有 exam_01_ 開頭的資料夾"""
     folders = []
@@ -5,76 +5,102 @@
 """
 
 import os
+import sys
 import shutil
-import docx
 import re
+import subprocess
+import importlib.util
+import zipfile
 import logging
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from sub_word_splitter import WordSplitter
+from sub_chinese_numbers import convert_chinese_numbers_to_digits
 
-try:
-    import pandas as pd
-except ImportError:
-    print("正在安裝 pandas...")
-    os.system("pip3 install pandas openpyxl")
-    import pandas as pd
+# document.xml中的XML標籤與空白（WordSplitter.clean_text比對前同樣會移除空白）
+_XML_TAG_OR_SPACE_RE = re.compile(r'<[^>]*>|[\s\u3000]+')
+# 章節標題的形狀（對應 WordSplitter.chapter_patterns：第…章、第1節、1. 章 等）
+_CHAPTER_HEADING_RE = re.compile(r'第.{1,3}[章節篇講堂課單元部分週周]|\d{1,2}[\.、][章節篇講堂課單元部分週周]')
 
-try:
-    import natsort
-except ImportError:
-    print("正在安裝 natsort...")
-    os.system("pip3 install natsort")
-    import natsort
+_NO_CHAPTERS = {
+    'has_chapters': False,
+    'chapter_count': 0,
+    'chapters': [],
+    'needs_splitting': False
+}
 
-def convert_chinese_numbers_to_digits(text):
-    """將中文數字轉換為阿拉伯數字以便自然排序"""
-    if not isinstance(text, str):
-        return str(text)
+def _quick_chapter_probe(path):
+    """直接掃描docx內的word/document.xml，判斷是否可能包含章節標題
     
-    # 中文數字對應表
-    chinese_digits = {
-        '零': '0', '一': '1', '二': '2', '三': '3', '四': '4', '五': '5',
-        '六': '6', '七': '7', '八': '8', '九': '9', '十': '10',
-        '〇': '0', '壹': '1', '貳': '2', '參': '3', '肆': '4', '伍': '5',
-        '陸': '6', '柒': '7', '捌': '8', '玖': '9', '拾': '10'
-    }
-    
-    result = text
-    
-    # 處理複雜的十位數字模式（如：十一、二十三、九十九等）
-    import re
-    
-    # 處理 "十X" 模式（如：十一、十二...十九）
-    def replace_shi_x(match):
-        x = match.group(1)
-        if x in chinese_digits:
-            return '1' + chinese_digits[x]
-        return match.group(0)
-    
-    result = re.sub(r'十([一二三四五六七八九壹貳參肆伍陸柒捌玖])', replace_shi_x, result)
-    
-    # 處理 "X十Y" 模式（如：二十一、三十五、九十九等）
-    def replace_x_shi_y(match):
-        x = match.group(1)
-        y = match.group(2) if match.group(2) else ''
-        x_digit = chinese_digits.get(x, x)
-        y_digit = chinese_digits.get(y, y) if y else '0'
-        if y:
-            return x_digit + y_digit
-        else:
-            return x_digit + '0'
-    
-    result = re.sub(r'([一二三四五六七八九壹貳參肆伍陸柒捌玖])十([一二三四五六七八九壹貳參肆伍陸柒捌玖]?)', replace_x_shi_y, result)
-    
-    # 處理單獨的 "十"
-    result = result.replace('十', '10')
+    只作為預先過濾：去除標籤與空白後找不到章節標題形狀時必定沒有章節；無法讀取時回傳True交由完整分析處理
+    """
+    try:
+        with zipfile.ZipFile(path) as z, z.open('word/document.xml') as f:
+            data = f.read()
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return True
+    # 標題文字可能被拆成多個<w:r>，先去除標籤把同一段落的文字接回再比對
+    text = _XML_TAG_OR_SPACE_RE.sub('', data.decode('utf-8', errors='replace'))
+    return _CHAPTER_HEADING_RE.search(text) is not None
+
+def _link_or_copy(src, dst):
+    """以硬連結取代複製；跨檔案系統等無法建立硬連結時退回一般複製
     
-    # 處理其他單個中文數字
-    for chinese, digit in chinese_digits.items():
-        result = result.replace(chinese, digit)
+    後續流程只會重命名原檔案、拆分時另存新檔，不會改寫原檔內容，因此與來源共用inode是安全的
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+def _rename(src, dst):
+    """直接以字串路徑呼叫os.rename，略過pathlib的物件建立"""
+    os.rename(os.fspath(src), os.fspath(dst))
+
+def _configure_logging(log_file):
+    """設定root logger：寫入本次執行的log檔並輸出到主控台"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file, encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+
+def _init_worker(log_file):
+    """進程池initializer：讓子進程的log也寫入本次執行的log檔
     
-    return result
+    fork啟動的子進程已繼承主進程的handler，不再重複加入；spawn啟動（Windows/macOS）的子進程沒有任何handler，
+    以附加模式開啟同一個log檔
+    """
+    if not logging.getLogger().hasHandlers():
+        _configure_logging(log_file)
+
+def _worker_splitter():
+    """建立子進程使用的Word拆分器，log經由root handler寫入本次執行的log檔（見 _init_worker）"""
+    return WordSplitter(logging.getLogger(__name__))
+
+def _submit(executor, fn, *args):
+    """提交子進程工作；進程池已損壞時submit本身就會拋出例外，改為返回帶有該例外的Future，交由呼叫端逐檔記錄"""
+    try:
+        return executor.submit(fn, *args)
+    except Exception as e:
+        future = Future()
+        future.set_exception(e)
+        return future
+
+def _analyze(path):
+    """子進程工作函式：分析單一Word檔案是否需要拆分"""
+    if not _quick_chapter_probe(path):
+        return path, dict(_NO_CHAPTERS, chapters=[])
+    return path, _worker_splitter().analyze_document(Path(path))
+
+def _split(path, output_dir, base_name):
+    """子進程工作函式：依章節拆分單一Word檔案"""
+    return path, _worker_splitter().split_document_by_chapters(Path(path), Path(output_dir), base_name)
 
 class AdvancedWordProcessor:
     def __init__(self):
@@ -83,6 +109,11 @@ class AdvancedWordProcessor:
         self.target_dir = self.base_dir / "exam_03_wordsplitter"
         self.log_dir = self.base_dir / "log"
         
+        # 本次執行的時間戳，所有輸出檔案共用同一後綴
+        self.run_started_at = datetime.now()
+        self.run_timestamp = self.run_started_at.strftime("%Y%m%d_%H%M%S")
+        self.run_started_at_str = self.run_started_at.strftime('%Y-%m-%d %H:%M:%S')
+        
         # 設置logging
         self.setup_logging()
         
@@ -91,20 +122,12 @@ class AdvancedWordProcessor:
         
     def setup_logging(self):
         """設置logging系統"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_file = self.log_dir / f"advanced_word_processing_{timestamp}.log"
+        self.log_file = self.log_dir / f"advanced_word_processing_{self.run_timestamp}.log"
         
         # 確保log目錄存在
         self.log_dir.mkdir(exist_ok=True)
         
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file, encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
+        _configure_logging(self.log_file)
         self.logger = logging.getLogger(__name__)
     
     def find_root_folders_with_word_files(self):
@@ -117,29 +140,48 @@ class AdvancedWordProcessor:
         
         self.logger.info(f"掃描根資料夾: {self.source_dir}")
         
-        # 只掃描第一層資料夾
+        # 只掃描第一層資料夾，找到第一個Word檔案即判定（完整列舉延後到複製之後）
         for item in self.source_dir.iterdir():
-            if item.is_dir():
-                word_files = self.find_word_files_in_folder(item)
-                if word_files:
-                    folder_info = {
-                        'path': item,
-                        'name': item.name,
-                        'word_files': word_files
-                    }
-                    root_folders.append(folder_info)
-                    self.logger.info(f"找到根資料夾: {item.name} (包含 {len(word_files)} 個Word檔案)")
+            if item.is_dir() and self.has_any_word_file(item):
+                folder_info = {
+                    'path': item,
+                    'name': item.name,
+                    'word_files': []
+                }
+                root_folders.append(folder_info)
+                self.logger.info("找到根資料夾: %s", item.name)
         
         return root_folders
     
+    @staticmethod
+    def is_word_file(file_name):
+        """判斷檔名是否為Word檔案（排除暫存檔）"""
+        return file_name.endswith(('.docx', '.doc')) and not file_name.startswith('~$')
+    
+    def has_any_word_file(self, folder_path):
+        """檢查資料夾中是否至少有一個Word檔案，找到即返回"""
+        for root, dirs, files in os.walk(folder_path):
+            for file in files:
+                if self.is_word_file(file):
+                    return True
+        return False
+    
     def find_word_files_in_folder(self, folder_path):
         """遞歸查找資料夾中的所有Word檔案"""
         word_files = []
-        
-        for root, dirs, files in os.walk(folder_path):
-            for file in files:
-                if file.endswith(('.docx', '.doc')) and not file.startswith('~$'):
-                    word_files.append(Path(root) / file)
+        pending = [os.fspath(folder_path)]
+        
+        while pending:
+            current = pending.pop()
+            subdirs = []
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif self.is_word_file(entry.name):
+                        word_files.append(Path(entry.path))
+            # 反向壓入，維持與os.walk相同的由上而下順序
+            pending.extend(reversed(subdirs))
         
         return word_files
     
@@ -152,28 +194,23 @@ class AdvancedWordProcessor:
             # 如果目標資料夾已存在，先刪除
             if target_path.exists():
                 shutil.rmtree(target_path)
-                self.logger.info(f"刪除已存在的目標資料夾: {target_path}")
+                self.logger.info("刪除已存在的目標資料夾: %s", target_path)
             
-            # 複製整個資料夾
-            shutil.copytree(source_path, target_path)
-            self.logger.info(f"成功複製根資料夾: {folder_info['name']}")
+            # 複製整個資料夾（檔案以硬連結建立，避免實際複製內容）
+            shutil.copytree(source_path, target_path, copy_function=_link_or_copy)
+            self.logger.info("成功複製根資料夾: %s", folder_info['name'])
             
             # 更新folder_info中的路徑
             folder_info['target_path'] = target_path
             
-            # 更新word_files路徑
-            new_word_files = []
-            for old_path in folder_info['word_files']:
-                relative_path = old_path.relative_to(source_path)
-                new_path = target_path / relative_path
-                new_word_files.append(new_path)
-            
-            folder_info['word_files'] = new_word_files
+            # 在複製後的目標資料夾中列舉Word檔案
+            folder_info['word_files'] = self.find_word_files_in_folder(target_path)
+            self.logger.info("根資料夾 %s 包含 %d 個Word檔案", folder_info['name'], len(folder_info['word_files']))
             
             return True
             
         except Exception as e:
-            self.logger.error(f"複製根資料夾失敗 {folder_info['name']}: {e}")
+            self.logger.error("複製根資料夾失敗 %s: %s", folder_info['name'], e)
             return False
     
     def process_single_word_file(self, folder_info):
@@ -191,22 +228,25 @@ class AdvancedWordProcessor:
         try:
             # 如果新名稱與舊名稱不同，才進行重命名
             if word_file.name != new_name:
-                word_file.rename(new_path)
-                self.logger.info(f"重命名檔案: {word_file.name} -> {new_name}")
+                _rename(word_file, new_path)
+                self.logger.info("重命名檔案: %s -> %s", word_file.name, new_name)
                 word_file = new_path
                 folder_info['word_files'][0] = word_file
         
         except Exception as e:
-            self.logger.error(f"重命名檔案失敗: {e}")
+            self.logger.error("重命名檔案失敗: %s", e)
             return
         
-        # 步驟2: 分析是否需要拆分
-        analysis = self.word_splitter.analyze_document(word_file)
+        # 步驟2: 分析是否需要拆分（先以快速掃描過濾不含章節字元的檔案）
+        if _quick_chapter_probe(word_file):
+            analysis = self.word_splitter.analyze_document(word_file)
+        else:
+            analysis = dict(_NO_CHAPTERS, chapters=[])
         
-        self.logger.info(f"章節分析結果 - {word_file.name}:")
-        self.logger.info(f"  包含章節: {analysis['has_chapters']}")
-        self.logger.info(f"  章節數量: {analysis['chapter_count']}")
-        self.logger.info(f"  需要拆分: {analysis['needs_splitting']}")
+        self.logger.info("章節分析結果 - %s:", word_file.name)
+        self.logger.info("  包含章節: %s", analysis['has_chapters'])
+        self.logger.info("  章節數量: %s", analysis['chapter_count'])
+        self.logger.info("  需要拆分: %s", analysis['needs_splitting'])
         
         # 步驟3: 如果需要拆分，執行拆分
         if analysis['needs_splitting']:
@@ -219,40 +259,64 @@ class AdvancedWordProcessor:
             if success:
                 # 拆分成功後，可以選擇刪除原檔案或重命名
                 original_backup = word_file.parent / f"original_{word_file.name}"
-                word_file.rename(original_backup)
-                self.logger.info(f"拆分成功，原檔案重命名為: {original_backup.name}")
+                _rename(word_file, original_backup)
+                self.logger.info("拆分成功，原檔案重命名為: %s", original_backup.name)
         else:
-            self.logger.info(f"不需要拆分: {word_file.name}")
+            self.logger.info("不需要拆分: %s", word_file.name)
     
-    def process_multiple_word_files(self, folder_info):
-        """處理多個Word檔案的情況"""
+    def process_multiple_word_files(self, folder_info, executor):
+        """處理多個Word檔案的情況，分析與拆分交給共用的進程池executor執行"""
         if len(folder_info['word_files']) <= 1:
             return
         
         folder_name = folder_info['name']
+        word_files = folder_info['word_files']
+        paths = [str(word_file) for word_file in word_files]
+        
+        # 第一階段：多進程並行分析所有檔案（XML解析為CPU密集工作）
+        # 逐檔提交並各自捕捉例外，單一檔案失敗不影響其他檔案的分析結果
+        analyze_jobs = {path: _submit(executor, _analyze, path) for path in paths}
+        analyses = {}
+        for path, future in analyze_jobs.items():
+            try:
+                analyses[path] = future.result()[1]
+            except Exception as e:
+                self.logger.error("分析檔案失敗 %s: %s", Path(path).name, e)
+        
+        # 第二階段：只對需要拆分的檔案並行執行拆分
+        split_jobs = {}
+        for word_file in word_files:
+            analysis = analyses.get(str(word_file))
+            if analysis and analysis['needs_splitting']:
+                self.logger.info("檔案需要拆分: %s", word_file.name)
+                base_name = f"{folder_name}_{word_file.stem}"
+                split_jobs[str(word_file)] = _submit(
+                    executor, _split, str(word_file), str(word_file.parent), base_name
+                )
+        
+        split_results = {}
+        for path, future in split_jobs.items():
+            try:
+                split_results[path] = future.result()[1]
+            except Exception as e:
+                self.logger.error("拆分檔案失敗 %s: %s", Path(path).name, e)
+                split_results[path] = False
+        
+        # 第三階段：主進程依序執行重命名
         processed_files = []
         
-        for word_file in folder_info['word_files']:
+        for word_file in word_files:
             try:
-                # 分析是否需要拆分
-                analysis = self.word_splitter.analyze_document(word_file)
+                analysis = analyses.get(str(word_file))
+                if analysis is None:
+                    raise RuntimeError("無法取得章節分析結果")
                 
                 if analysis['needs_splitting']:
-                    # 需要拆分的檔案
-                    self.logger.info(f"檔案需要拆分: {word_file.name}")
-                    base_name = f"{folder_name}_{word_file.stem}"
-                    
-                    success = self.word_splitter.split_document_by_chapters(
-                        word_file,
-                        word_file.parent,
-                        base_name
-                    )
-                    
-                    if success:
+                    if split_results.get(str(word_file)):
                         # 拆分成功後重命名原檔案
                         original_backup = word_file.parent / f"original_{word_file.name}"
-                        word_file.rename(original_backup)
-                        self.logger.info(f"拆分成功，原檔案重命名為: {original_backup.name}")
+                        _rename(word_file, original_backup)
+                        self.logger.info("拆分成功，原檔案重命名為: %s", original_backup.name)
                         processed_files.append(original_backup)
                     else:
                         processed_files.append(word_file)
@@ -262,43 +326,51 @@ class AdvancedWordProcessor:
                     new_path = word_file.parent / new_name
                     
                     if word_file.name != new_name:
-                        word_file.rename(new_path)
-                        self.logger.info(f"重命名檔案: {word_file.name} -> {new_name}")
+                        _rename(word_file, new_path)
+                        self.logger.info("重命名檔案: %s -> %s", word_file.name, new_name)
                         processed_files.append(new_path)
                     else:
                         processed_files.append(word_file)
             
             except Exception as e:
-                self.logger.error(f"處理檔案失敗 {word_file.name}: {e}")
+                self.logger.error("處理檔案失敗 %s: %s", word_file.name, e)
                 processed_files.append(word_file)
         
         folder_info['word_files'] = processed_files
     
     def generate_processing_report(self, processed_folders):
         """生成處理報告"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_path = self.log_dir / f"advanced_processing_report_{timestamp}.txt"
+        report_path = self.log_dir / f"advanced_processing_report_{self.run_timestamp}.txt"
         
         total_folders = len(processed_folders)
         total_word_files = sum(len(folder['word_files']) for folder in processed_folders)
         
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write("進階Word檔案處理報告\n")
-            f.write("=" * 50 + "\n")
-            f.write(f"處理時間: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"處理根資料夾數: {total_folders}\n")
-            f.write(f"總Word檔案數: {total_word_files}\n\n")
+        # 先在記憶體中組合完整報告，最後一次寫入
+        parts = []
+        app = parts.append
+        app("進階Word檔案處理報告\n")
+        app("=" * 50 + "\n")
+        app(f"處理時間: {self.run_started_at_str}\n")
+        app(f"處理根資料夾數: {total_folders}\n")
+        app(f"總Word檔案數: {total_word_files}\n\n")
+        
+        for folder in processed_folders:
+            app(f"根資料夾: {folder['name']}\n")
+            app(f"  Word檔案數量: {len(folder['word_files'])}\n")
+            app(f"  處理類型: {'單一檔案處理' if len(folder['word_files']) <= 1 else '多檔案處理'}\n")
+            app(f"  檔案列表:\n")
             
-            for folder in processed_folders:
-                f.write(f"根資料夾: {folder['name']}\n")
-                f.write(f"  Word檔案數量: {len(folder['word_files'])}\n")
-                f.write(f"  處理類型: {'單一檔案處理' if len(folder['word_files']) <= 1 else '多檔案處理'}\n")
-                f.write(f"  檔案列表:\n")
-                
-                for word_file in folder['word_files']:
-                    relative_path = word_file.relative_to(folder['target_path'])
-                    f.write(f"    - {relative_path}\n")
-                f.write("\n")
+            # 以字串前綴計算相對路徑，避免每個檔案都呼叫Path.relative_to
+            target_prefix = os.fspath(folder['target_path']) + os.sep
+            prefix_len = len(target_prefix)
+            for word_file in folder['word_files']:
+                word_file_str = os.fspath(word_file)
+                relative_path = word_file_str[prefix_len:] if word_file_str.startswith(target_prefix) else word_file_str
+                app(f"    - {relative_path}\n")
+            app("\n")
+        
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(''.join(parts))
             
         self.logger.info(f"處理報告已生成: {report_path}")
     
@@ -326,27 +398,22 @@ class AdvancedWordProcessor:
         
         return word_files_with_folder
     
-    def extract_docx_info(self, word_file_path, folder_name):
-        """從Word檔案提取所需資訊"""
+    def write_todolist_excel(self, df, excel_path):
+        """以xlsxwriter常數記憶體模式逐列寫出待辦列表
+        
+        constant_memory模式只保留目前列，必須依列順序寫入，因此不透過df.to_excel（其按欄寫入）
+        """
+        import xlsxwriter
+        
+        workbook = xlsxwriter.Workbook(str(excel_path), {'constant_memory': True})
         try:
-            filename = word_file_path.name
-            
-            return {
-                '資料夾': folder_name,
-                'docx文件名': filename,
-                '標題名稱': filename.replace('.docx', '').replace('.doc', ''),
-                '題庫資源ID': "",  # 空白
-                '資源創建時間': "",  # 空白
-                '題庫編號': "",  # 空白
-                '題庫創建時間': "",  # 空白
-                '題庫標題': filename.replace('.docx', '').replace('.doc', ''),  # 同標題名稱
-                '標題修改時間': "",  # 空白
-                '識別完成保存時間': ""  # 空白
-            }
-            
-        except Exception as e:
-            self.logger.error(f"讀取 {word_file_path} 時發生錯誤: {e}")
-            return None
+            worksheet = workbook.add_worksheet('Sheet1')
+            header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+            worksheet.write_row(0, 0, list(df.columns), header_format)
+            for row_idx, row in enumerate(df.itertuples(index=False, name=None), 1):
+                worksheet.write_row(row_idx, 0, row)
+        finally:
+            workbook.close()
     
     def create_docx_todolist(self):
         """創建docx檔案的待辦列表Excel檔案"""
@@ -367,43 +434,69 @@ class AdvancedWordProcessor:
             output_dir.mkdir(parents=True)
             self.logger.info(f"已創建資料夾: {output_dir}")
         
-        # 提取所有Word檔案資訊
-        data_list = []
+        # 延遲載入：只有建立待辦列表時才需要pandas、natsort與xlsxwriter
+        # 先以find_spec檢查是否已安裝，缺少時才透過pip安裝（失敗會直接拋出例外）
+        missing_packages = [pkg for pkg in ('pandas', 'natsort', 'xlsxwriter') if importlib.util.find_spec(pkg) is None]
+        if missing_packages:
+            print(f"正在安裝 {' '.join(missing_packages)}...")
+            subprocess.check_call([sys.executable, "-m", "pip", "install", *missing_packages])
+            importlib.invalidate_caches()
+        
+        import pandas as pd
+        import natsort
+        
+        # 提取所有Word檔案資訊，直接按欄位收集
+        folders = []
+        file_names = []
+        titles = []
         for word_file_path, folder_name in word_files_with_folder:
-            docx_info = self.extract_docx_info(word_file_path, folder_name)
-            if docx_info:
-                data_list.append(docx_info)
-        
-        if not data_list:
-            self.logger.info("無法提取任何有效資料")
-            return
-        
-        # 創建DataFrame
-        df = pd.DataFrame(data_list)
-        
-        # 按標題名稱自然排序（支援中文數字）
-        if not df.empty and '標題名稱' in df.columns:
-            # 先轉換中文數字為阿拉伯數字
-            converted_titles = df['標題名稱'].astype(str).apply(convert_chinese_numbers_to_digits)
-            # 使用轉換後的標題進行自然排序
-            sorted_indices = natsort.index_natsorted(converted_titles)
-            df = df.iloc[sorted_indices].reset_index(drop=True)
-            self.logger.info("已按標題名稱進行自然排序（包含中文數字轉換）")
+            file_name = word_file_path.name
+            folders.append(folder_name)
+            file_names.append(file_name)
+            titles.append(file_name.replace('.docx', '').replace('.doc', ''))
+        
+        # 按標題名稱自然排序（支援中文數字），在建立DataFrame前先排序資料
+        # 找不到Word檔案時已在上方提前返回，此處標題列表必定非空，無需再檢查DataFrame
+        # 先轉換中文數字為阿拉伯數字
+        converted_titles = [convert_chinese_numbers_to_digits(t) for t in titles]
+        # 每個標題只產生一次自然排序鍵，再以內建sorted排序索引
+        natural_key = natsort.natsort_keygen(alg=natsort.ns.INT)
+        sort_keys = [natural_key(t) for t in converted_titles]
+        sorted_indices = sorted(range(len(sort_keys)), key=sort_keys.__getitem__)
+        folders = [folders[i] for i in sorted_indices]
+        file_names = [file_names[i] for i in sorted_indices]
+        titles = [titles[i] for i in sorted_indices]
+        self.logger.info("已按標題名稱進行自然排序（包含中文數字轉換）")
+        
+        # 創建DataFrame（題庫標題同標題名稱，其餘欄位空白）
+        row_count = len(titles)
+        empty = [""] * row_count
+        df = pd.DataFrame({
+            '資料夾': folders,
+            'docx文件名': file_names,
+            '標題名稱': titles,
+            '題庫資源ID': empty,
+            '資源創建時間': empty,
+            '題庫編號': empty,
+            '題庫創建時間': empty,
+            '題庫標題': titles,
+            '標題修改時間': empty,
+            '識別完成保存時間': empty
+        })
         
         # 生成時間戳檔案名
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        excel_filename = f"docx_todolist_{timestamp}.xlsx"
+        excel_filename = f"docx_todolist_{self.run_timestamp}.xlsx"
         excel_path = output_dir / excel_filename
         
         # 儲存為Excel檔案
         try:
-            df.to_excel(excel_path, index=False, engine='openpyxl')
+            self.write_todolist_excel(df, excel_path)
             self.logger.info(f"已創建Word檔案待辦列表: {excel_path}")
-            self.logger.info(f"包含 {len(data_list)} 筆資料")
+            self.logger.info(f"包含 {row_count} 筆資料")
             
             print(f"\n=== 創建Word檔案待辦列表完成 ===")
             print(f"檔案路徑: {excel_path}")
-            print(f"檔案數量: {len(data_list)}")
+            print(f"檔案數量: {row_count}")
             
             # 顯示前5筆資料作為預覽
             print("\n預覽前5筆資料:")
@@ -427,23 +520,26 @@ class AdvancedWordProcessor:
         
         processed_folders = []
         
-        for folder_info in root_folders:
-            self.logger.info(f"\n處理根資料夾: {folder_info['name']}")
-            
-            # 步驟2: 複製根資料夾
-            if self.copy_root_folder(folder_info):
+        # 所有多檔案資料夾共用一個進程池（子進程在首次提交時才啟動），spawn啟動時不必每個資料夾重新啟動與重新import；
+        # initializer讓子進程的log也寫入本次執行的log檔
+        with ProcessPoolExecutor(initializer=_init_worker, initargs=(str(self.log_file),)) as executor:
+            for folder_info in root_folders:
+                self.logger.info("\n處理根資料夾: %s", folder_info['name'])
                 
-                # 步驟3: 根據Word檔案數量決定處理方式
-                if len(folder_info['word_files']) == 1:
-                    self.logger.info("檢測到單一Word檔案，執行單一檔案處理流程")
-                    self.process_single_word_file(folder_info)
+                # 步驟2: 複製根資料夾
+                if self.copy_root_folder(folder_info):
+                    
+                    # 步驟3: 根據Word檔案數量決定處理方式
+                    if len(folder_info['word_files']) == 1:
+                        self.logger.info("檢測到單一Word檔案，執行單一檔案處理流程")
+                        self.process_single_word_file(folder_info)
+                    else:
+                        self.logger.info("檢測到 %d 個Word檔案，執行多檔案處理流程", len(folder_info['word_files']))
+                        self.process_multiple_word_files(folder_info, executor)
+                    
+                    processed_folders.append(folder_info)
                 else:
-                    self.logger.info(f"檢測到 {len(folder_info['word_files'])} 個Word檔案，執行多檔案處理流程")
-                    self.process_multiple_word_files(folder_info)
-                
-                processed_folders.append(folder_info)
-            else:
-                self.logger.error(f"跳過根資料夾: {folder_info['name']} (複製失敗)")
+                    self.logger.error("跳過根資料夾: %s (複製失敗)", folder_info['name'])
         
         # 步驟4: 生成處理報告
         if processed_folders:
@@ -3,90 +3,177 @@
 exam_5_wordpouring.py - Word資源批量上傳工具
 功能：
 1. 選擇 exam_04_docx_todolist 中的 Excel 文件（按時間排序，過濾暫存文件）
-2. 逐行讀取Excel，創建未上傳的Word資源
+2. 讀取Excel，並行創建未上傳的Word資源
 3. 取得資源ID後更新Excel文件
-4. 即時更新Excel文件
+4. 分批更新Excel文件（中斷時可由進度檔案恢復）
 """
 
 import os
-import glob
+import json
+import importlib.util
+import atexit
+import asyncio
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import logging
-from datetime import datetime
+import logging.handlers
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 from pathlib import Path
 
-try:
-    import pandas as pd
-except ImportError:
-    print("正在安裝 pandas...")
-    os.system("pip3 install pandas openpyxl")
-    import pandas as pd
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import TimeoutException
+
+# pandas 延遲到實際處理Excel時才載入（見 _import_pandas）
+pd = None
 
 # 導入子模組
 from create_05_material import upload_material
 from config import BASE_URL, COOKIE
 from tronc_login import login_and_get_cookie, update_config, setup_driver
 from sub_library_creator import create_library
+from sub_chinese_numbers import convert_chinese_numbers_series
 # from sub_return_library import return_to_library_page  # 已替換為自定義方法
 
-def convert_chinese_numbers_to_digits(text):
-    """將中文數字轉換為阿拉伯數字以便自然排序"""
-    if not isinstance(text, str):
-        return str(text)
-    
-    # 中文數字對應表
-    chinese_digits = {
-        '零': '0', '一': '1', '二': '2', '三': '3', '四': '4', '五': '5',
-        '六': '6', '七': '7', '八': '8', '九': '9', '十': '10',
-        '○': '0', '壹': '1', '貳': '2', '參': '3', '肆': '4', '伍': '5',
-        '陸': '6', '柒': '7', '捌': '8', '玖': '9', '拾': '10'
-    }
-    
-    result = text
-    
-    # 處理複雜的十位數字模式（如：十一、二十三、九十九等）
-    import re
-    
-    # 處理 "十X" 模式（如：十一、十二...十九）
-    def replace_shi_x(match):
-        x = match.group(1)
-        if x in chinese_digits:
-            return '1' + chinese_digits[x]
-        return match.group(0)
-    
-    result = re.sub(r'十([一二三四五六七八九壹貳參肆伍陸柒捌玖])', replace_shi_x, result)
-    
-    # 處理 "X十Y" 模式（如：二十一、三十五、九十九等）
-    def replace_x_shi_y(match):
-        x = match.group(1)
-        y = match.group(2) if match.group(2) else ''
-        x_digit = chinese_digits.get(x, x)
-        y_digit = chinese_digits.get(y, y) if y else '0'
-        if y:
-            return x_digit + y_digit
-        else:
-            return x_digit + '0'
-    
-    result = re.sub(r'([一二三四五六七八九壹貳參肆伍陸柒捌玖])十([一二三四五六七八九壹貳參肆伍陸柒捌玖]?)', replace_x_shi_y, result)
-    
-    # 處理單獨的 "十"
-    result = result.replace('十', '10')
-    
-    # 處理其他單個中文數字
-    for chinese, digit in chinese_digits.items():
-        result = result.replace(chinese, digit)
-    
+def _import_pandas():
+    """首次需要處理Excel時才載入pandas，缺少時自動安裝"""
+    global pd
+    if pd is None:
+        try:
+            import pandas
+        except ImportError:
+            print("正在安裝 pandas...")
+            os.system("pip3 install pandas openpyxl")
+            import pandas
+        pd = pandas
+    return pd
+
+# 已安裝 python-calamine 時以其（Rust實作）讀取Excel，比預設的openpyxl快；寫入仍使用openpyxl
+_CALAMINE_AVAILABLE = importlib.util.find_spec('python_calamine') is not None
+
+# Word文件副檔名
+_WORD_SUFFIXES = {'.docx', '.doc'}
+
+# 登入刷新後的Cookie在此時間內（分鐘）直接視為有效，不再探測
+COOKIE_TRUST_MINUTES = 30
+
+# 探測驗證通過的Cookie在此時間內（秒）再次檢查時直接沿用結果，避免同一流程重複探測
+AUTH_CHECK_REUSE_SECONDS = 60
+
+# 同時進行中的資源上傳數量上限
+UPLOAD_CONCURRENCY = 8
+
+# 上傳回應401/403（Cookie中途失效）時，單筆最多嘗試次數（重試前等待 2^n 秒）
+UPLOAD_AUTH_ATTEMPTS = 3
+
+# 檔案log緩衝筆數（ERROR以上立即寫入）
+LOG_BUFFER_CAPACITY = 200
+
+# 從瀏覽器讀取的cookies快取秒數（修改題庫標題時共用，遇到401/403即重新讀取）
+DRIVER_COOKIE_CACHE_SECONDS = 60
+
+# 只需修改標題的題庫，同時送出的標題修改請求數量上限
+TITLE_UPDATE_CONCURRENCY = 4
+
+# 每成功上傳多少筆才寫回一次Excel（期間的結果先記錄在旁路進度檔中）
+EXCEL_FLUSH_EVERY = 20
+
+# Excel中時間欄位的格式
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def _now_str():
+    """目前時間字串（time.strftime不需建立datetime物件）"""
+    return time.strftime(_TIME_FORMAT)
+
+def _read_excel(excel_path, **kwargs):
+    """讀取Excel，可用時使用calamine引擎（pandas 2.2起支援）"""
+    if _CALAMINE_AVAILABLE and tuple(int(v) for v in pd.__version__.split('.')[:2]) >= (2, 2):
+        kwargs.setdefault('engine', 'calamine')
+    return pd.read_excel(excel_path, **kwargs)
+
+def _id_strings(series):
+    """將ID欄位一次轉為字串（Excel讀出的 1234.0 轉為 "1234"），空值保持為NA，非數值內容原樣保留"""
+    numeric = pd.to_numeric(series, errors='coerce')
+    whole = numeric.notna() & (numeric % 1 == 0)
+    result = series.astype('string').str.strip()
+    result[whole] = numeric[whole].astype('int64').astype('string')
     return result
 
+def _filled_mask(series):
+    """非空白儲存格的布林遮罩（NA、空字串與純空白皆視為空白）"""
+    return series.astype('string').str.strip().fillna('') != ''
+
+def _fast_to_excel(df, path):
+    """以openpyxl write-only模式逐列寫出DataFrame（不含索引與樣式），空值寫為空白儲存格"""
+    import openpyxl
+    
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet('Sheet1')
+    ws.append(list(df.columns))
+    # 一次性將空值換成None，逐列直接附加itertuples產生的tuple（不使用df.iloc逐列索引）
+    values = df.astype(object).where(df.notna(), None)
+    for row in values.itertuples(index=False, name=None):
+        ws.append(row)
+    wb.save(path)
+
+def _replace_excel(df, path):
+    """先寫到暫存檔再替換原檔，避免寫到一半中斷時留下損壞的Excel"""
+    tmp_path = f"{path}.tmp"
+    _fast_to_excel(df, tmp_path)
+    os.replace(tmp_path, path)
+
 class WordResourceTool:
     def __init__(self):
         self.base_url = BASE_URL
-        self.current_driver = None  # 保持selenium會話
-        self.cookie_string = COOKIE
+        self.current_driver = None  # 保持selenium會話（登入刷新Cookie與題庫處理共用）
+        atexit.register(self.close_driver)
+        self._driver_cookies = None  # 瀏覽器cookies快取（轉為requests格式）
+        self._driver_cookies_at = 0.0
+        self._driver_cookie_lock = threading.Lock()  # 並行修改標題時只讓一個執行緒讀取瀏覽器
+        self._set_cookie_string(COOKIE)
         self.last_cookie_update = None  # 記錄最後一次cookie更新時間
+        self._auth_checked_at = None  # 最後一次探測驗證通過的時間（time.monotonic）
+        self._cookie_lock = threading.Lock()  # 並行上傳時只讓一個執行緒重新登入
+        self._http_local = threading.local()  # 每個執行緒各自的HTTP Session，見 http 屬性
         self.setup_logging()
     
+    def _set_cookie_string(self, cookie_string):
+        """更新Cookie字串，並同步解析為字典供各請求重複使用（略過格式不正確的項目）"""
+        self.cookie_string = cookie_string
+        self._cookies_dict = dict(item.split("=", 1) for item in cookie_string.split("; ") if "=" in item)
+    
+    @property
+    def http(self):
+        """目前執行緒的requests Session
+        
+        requests.Session不保證執行緒安全（Cookie jar與連線池狀態會被並行修改），
+        並行上傳的每個工作執行緒各自建立一個；執行緒池的執行緒會重複使用，TLS連線仍可沿用
+        """
+        session = getattr(self._http_local, 'session', None)
+        if session is None:
+            session = self._http_local.session = self.create_http_session()
+        return session
+    
+    def create_http_session(self):
+        """建立requests Session，供Cookie測試、資源上傳與標題修改重複使用連線（每個執行緒一個，見 http 屬性）"""
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        
+        session = requests.Session()
+        session.verify = False
+        # 閘道暫時錯誤時自動重試（預設只重試GET/PUT等冪等請求，上傳用的POST不會重送）
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
     def setup_logging(self):
         """設置log記錄功能"""
         log_dir = 'log'
@@ -101,7 +188,7 @@ class WordResourceTool:
         self.logger.setLevel(logging.DEBUG)
         self.logger.handlers.clear()
         
-        file_handler = logging.FileHandler(log_path, encoding='utf-8')
+        file_handler = logging.FileHandler(log_path, encoding='utf-8', delay=True)
         file_handler.setLevel(logging.DEBUG)
         
         console_handler = logging.StreamHandler()
@@ -116,21 +203,25 @@ class WordResourceTool:
         file_handler.setFormatter(detailed_formatter)
         console_handler.setFormatter(simple_formatter)
         
-        self.logger.addHandler(file_handler)
+        # 檔案log先累積在記憶體，滿LOG_BUFFER_CAPACITY筆或遇到ERROR才寫入（程式結束時自動寫出）
+        buffered_file_handler = logging.handlers.MemoryHandler(
+            LOG_BUFFER_CAPACITY, flushLevel=logging.ERROR, target=file_handler
+        )
+        buffered_file_handler.setLevel(logging.DEBUG)
+        
+        self.logger.addHandler(buffered_file_handler)
         self.logger.addHandler(console_handler)
         
         self.logger.info(f"Log檔案: {log_path}")
         self.logger.info("=== Word資源批量上傳工具開始 ===\n")
     
     def test_cookie_validity(self):
-        """測試當前 Cookie 是否有效"""
+        """測試當前 Cookie 是否有效
+        
+        返回 'ok'（有效）、'bad'（認證失敗）或 'unknown'（無法判斷，需改用備選endpoint確認）
+        """
         try:
-            import requests
-            import urllib3
-            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-            
-            # 將 Cookie 字串轉為字典
-            cookies = dict(item.split("=", 1) for item in self.cookie_string.split("; "))
+            cookies = self._cookies_dict
             
             headers = {
                 "Accept": "application/json, text/plain, */*",
@@ -138,40 +229,43 @@ class WordResourceTool:
                 "X-Requested-With": "XMLHttpRequest"
             }
             
-            # 使用課程列表 API 進行測試
+            # 使用課程列表 API 進行測試，先以不含回應內容的HEAD請求判斷
             test_url = f"{self.base_url}/api/course"
-            response = requests.get(test_url, headers=headers, cookies=cookies, verify=False, timeout=10)
+            response = self.http.head(test_url, headers=headers, cookies=cookies, timeout=10, allow_redirects=False)
+            self.logger.info(f"Cookie測試(HEAD) - 狀態碼: {response.status_code}")
+            if response.status_code in [200, 201]:
+                return 'ok'
+            if response.status_code in [401, 403]:
+                return 'bad'
+            
+            # 伺服器不支援HEAD或回應無法判斷（如405、302）時，改用完整GET請求
+            response = self.http.get(test_url, headers=headers, cookies=cookies, timeout=10)
             
             self.logger.info(f"Cookie測試 - 狀態碼: {response.status_code}")
-            self.logger.info(f"Cookie測試 - 響應頭: {dict(response.headers)}")
+            self.logger.debug("Cookie測試 - 響應頭: %s", dict(response.headers))
             
             # 記錄響應內容（前200字符）
             response_text = response.text[:200] + "..." if len(response.text) > 200 else response.text
-            self.logger.info(f"Cookie測試 - 響應內容: {response_text}")
+            self.logger.debug("Cookie測試 - 響應內容: %s", response_text)
             
             # 如果狀態碼是 200 或 201，表示 cookie 有效
             if response.status_code in [200, 201]:
-                return True
+                return 'ok'
             # 如果狀態碼是 401、403 或 500，表示認證失敗或服務器錯誤
             elif response.status_code in [401, 403, 500]:
-                return False
-            # 其他狀態碼（如404等）可能是endpoint問題，嘗試其他測試方式
+                return 'bad'
+            # 其他狀態碼（如404等）可能是endpoint問題，交由備選endpoint判斷
             else:
-                # 嘗試另一個endpoint進行測試
-                return self.test_cookie_alternative_endpoint()
+                return 'unknown'
                 
         except Exception as e:
             self.logger.error(f"Cookie測試時發生錯誤: {e}")
-            return False
+            return 'unknown'
     
     def test_cookie_alternative_endpoint(self):
         """使用備選endpoint測試Cookie有效性"""
         try:
-            import urllib3
-            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-            
-            # 將 Cookie 字串轉為字典
-            cookies = dict(item.split("=", 1) for item in self.cookie_string.split("; "))
+            cookies = self._cookies_dict
             
             headers = {
                 "Accept": "application/json, text/plain, */*",
@@ -189,7 +283,7 @@ class WordResourceTool:
             for endpoint in alternative_endpoints:
                 try:
                     self.logger.info(f"測試備選endpoint: {endpoint}")
-                    response = requests.get(endpoint, headers=headers, cookies=cookies, verify=False, timeout=10)
+                    response = self.http.get(endpoint, headers=headers, cookies=cookies, timeout=10)
                     
                     self.logger.info(f"備選endpoint測試 - 狀態碼: {response.status_code}")
                     
@@ -218,11 +312,15 @@ class WordResourceTool:
         self.logger.info("開始自動登入流程")
         
         try:
-            result = login_and_get_cookie()
+            # 重複使用同一個瀏覽器登入，只有第一次需要啟動
+            if not self.current_driver:
+                self.current_driver = setup_driver()
+            result = login_and_get_cookie(driver=self.current_driver)
             
             if result:
                 cookie_string, modules = result
-                self.cookie_string = cookie_string
+                self._set_cookie_string(cookie_string)
+                self._driver_cookies = None  # 瀏覽器已重新登入，cookies快取失效
                 self.last_cookie_update = datetime.now()  # 記錄更新時間
                 self.logger.info("自動登入成功，Cookie已更新")
                 print("✅ 自動登入成功，Cookie已更新")
@@ -246,29 +344,44 @@ class WordResourceTool:
             print(f"❌ 自動登入過程發生錯誤: {e}")
             return False
     
+    def refresh_cookie_if_stale(self, stale_cookie_string):
+        """並行上傳遇到認證失效時呼叫：若其他執行緒已刷新過Cookie則直接沿用"""
+        with self._cookie_lock:
+            if self.cookie_string != stale_cookie_string:
+                return True
+            return self.refresh_cookie()
+    
     def check_and_refresh_cookie(self):
         """檢查Cookie並在需要時自動刷新"""
-        # 如果cookie是最近更新的（5分鐘內），直接認為有效
+        # 如果cookie是最近更新的（COOKIE_TRUST_MINUTES分鐘內），直接認為有效
         if self.last_cookie_update:
-            from datetime import datetime, timedelta
-            if datetime.now() - self.last_cookie_update < timedelta(minutes=5):
+            if datetime.now() - self.last_cookie_update < timedelta(minutes=COOKIE_TRUST_MINUTES):
                 self.logger.info("Cookie是最近更新的，直接認為有效")
                 print("✅ Cookie是最近更新的，跳過驗證")
                 return True
         
+        # 同一流程中剛驗證過（如run()之後緊接著處理Excel），直接沿用結果
+        if self._auth_checked_at and time.monotonic() - self._auth_checked_at < AUTH_CHECK_REUSE_SECONDS:
+            self.logger.info("Cookie剛驗證通過，略過重複驗證")
+            return True
+        
         # 嘗試主要endpoint測試
         self.logger.info("開始測試Cookie有效性...")
-        if self.test_cookie_validity():
+        state = self.test_cookie_validity()
+        if state == 'ok':
             self.logger.info("主要endpoint測試通過")
+            self._auth_checked_at = time.monotonic()
             return True
         
-        # 如果主要endpoint失敗，嘗試備選endpoint
-        self.logger.info("主要endpoint測試失敗，嘗試備選endpoint...")
-        print("⚠️ 主要endpoint測試失敗，嘗試備選endpoint...")
-        if self.test_cookie_alternative_endpoint():
-            self.logger.info("備選endpoint驗證通過，Cookie有效")
-            print("✅ 備選endpoint驗證通過，Cookie有效")
-            return True
+        # 只有主要endpoint無法判斷時，才嘗試備選endpoint
+        if state == 'unknown':
+            self.logger.info("主要endpoint無法判斷，嘗試備選endpoint...")
+            print("⚠️ 主要endpoint無法判斷，嘗試備選endpoint...")
+            if self.test_cookie_alternative_endpoint():
+                self.logger.info("備選endpoint驗證通過，Cookie有效")
+                print("✅ 備選endpoint驗證通過，Cookie有效")
+                self._auth_checked_at = time.monotonic()
+                return True
         
         # 所有API驗證都失敗，進行自動登入刷新
         # 但刷新成功後不再進行API驗證（避免500狀態碼誤判）
@@ -316,21 +429,26 @@ class WordResourceTool:
             print(f"找不到 {todolist_dir} 資料夾")
             return None
         
-        # 尋找Excel文件，過濾~開頭的暫存文件
-        all_files = glob.glob(os.path.join(todolist_dir, "*.xlsx"))
-        excel_files = [f for f in all_files if not os.path.basename(f).startswith('~')]
+        # 尋找Excel文件，過濾~開頭的暫存文件（scandir一次取得修改時間）
+        with os.scandir(todolist_dir) as entries:
+            excel_entries = [
+                (entry.stat().st_mtime, entry.path)
+                for entry in entries
+                if entry.name.endswith('.xlsx') and not entry.name.startswith(('~', '.')) and entry.is_file()
+            ]
         
-        if not excel_files:
+        if not excel_entries:
             print(f"在 {todolist_dir} 中找不到任何有效的 Excel 文件")
             return None
         
         # 按修改時間排序（最新到最舊）
-        excel_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
+        excel_entries.sort(reverse=True)
+        excel_files = [path for _, path in excel_entries]
         
         print(f"找到以下 Excel 文件（按時間排序）:")
-        for i, file in enumerate(excel_files, 1):
+        for i, (file_mtime, file) in enumerate(excel_entries, 1):
             filename = os.path.basename(file)
-            mtime = datetime.fromtimestamp(os.path.getmtime(file)).strftime("%Y-%m-%d %H:%M:%S")
+            mtime = time.strftime(_TIME_FORMAT, time.localtime(file_mtime))
             print(f"{i}. {filename} ({mtime})")
         
         while True:
@@ -366,8 +484,8 @@ class WordResourceTool:
             docx_path = os.path.join(base_dir, docx_filename)
         return docx_path
     
-    def create_resource(self, docx_file_path, title):
-        """創建資源"""
+    def create_resource(self, docx_file_path, title, check_cookie=True):
+        """創建資源（批次並行上傳時由呼叫端先統一檢查Cookie，可傳入check_cookie=False）"""
         self.logger.info(f"開始創建資源: 文件={docx_file_path}, 標題={title}")
         
         try:
@@ -377,7 +495,7 @@ class WordResourceTool:
                 return None, None
             
             # 檢查並刷新Cookie
-            if not self.check_and_refresh_cookie():
+            if check_cookie and not self.check_and_refresh_cookie():
                 self.logger.error("Cookie驗證和刷新均失敗")
                 print("❌ 認證失敗，請檢查登入憑證")
                 return None, None
@@ -386,13 +504,24 @@ class WordResourceTool:
             self.logger.info(f"正在上傳文件: {os.path.basename(docx_file_path)}")
             self.logger.info(f"文件大小: {os.path.getsize(docx_file_path)} 字節")
             
-            result = upload_material(self.cookie_string, docx_file_path, parent_id=0, file_type="resource")
-            
-            self.logger.info(f"上傳結果: {result}")
+            # 不再逐筆探測Cookie，改由上傳回應的401/403觸發刷新並重試此筆
+            for attempt in range(1, UPLOAD_AUTH_ATTEMPTS + 1):
+                cookie_string = self.cookie_string
+                result = upload_material(cookie_string, docx_file_path, parent_id=0, file_type="resource", session=self.http)
+                
+                self.logger.info(f"上傳結果: {result}")
+                
+                if result["success"] or result.get("status_code") not in (401, 403) or attempt == UPLOAD_AUTH_ATTEMPTS:
+                    break
+                
+                self.logger.warning(f"上傳回應 {result['status_code']}，Cookie可能已失效，刷新後重試 ({attempt}/{UPLOAD_AUTH_ATTEMPTS})")
+                print(f"⚠️ 認證失效 ({result['status_code']})，刷新Cookie後重試...")
+                self.refresh_cookie_if_stale(cookie_string)
+                time.sleep(2 ** attempt)
             
             if result["success"]:
                 resource_id = str(result["material_id"])
-                create_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                create_time = _now_str()
                 
                 self.logger.info(f"資源上傳成功: ID={resource_id}")
                 print(f"✅ 資源創建成功: ID={resource_id}")
@@ -427,28 +556,20 @@ class WordResourceTool:
             
             self.logger.info(f"開始掃描目錄: {base_dir}")
             
-            # 遞歸查找所有Word文件（排除original開頭的文件）
-            for root, _, files in os.walk(str(base_dir)):
-                root_path = Path(root)
-                self.logger.info(f"掃描資料夾: {root_path}")
+            # 遞歸查找所有Word文件（排除original開頭的文件），副檔名以預先建立的集合比對
+            for word_file_path in base_dir.rglob('*'):
+                if word_file_path.suffix.lower() not in _WORD_SUFFIXES:
+                    continue
+                if word_file_path.name.startswith(('~$', 'original_')) or not word_file_path.is_file():
+                    continue
                 
-                for file in files:
-                    if (file.lower().endswith(('.docx', '.doc')) and 
-                        not file.startswith('~$') and 
-                        not file.startswith('original_')):
-                        
-                        word_file_path = root_path / file
-                        
-                        # 獲取相對於base_dir的資料夾名稱
-                        try:
-                            relative_folder = root_path.relative_to(base_dir)
-                            folder_name = str(relative_folder) if str(relative_folder) != '.' else ""
-                            self.logger.info(f"找到文件: {file}, 資料夾: {folder_name}")
-                        except ValueError as e:
-                            self.logger.warning(f"計算相對路徑失敗: {e}")
-                            folder_name = ""
-                        
-                        word_files_with_folder.append((word_file_path, folder_name))
+                # 獲取相對於base_dir的資料夾名稱
+                folder_name = str(word_file_path.parent.relative_to(base_dir))
+                if folder_name == '.':
+                    folder_name = ""
+                self.logger.debug("找到文件: %s, 資料夾: %s", word_file_path.name, folder_name)
+                
+                word_files_with_folder.append((word_file_path, folder_name))
             
             if not word_files_with_folder:
                 print("❌ 在exam_03_wordsplitter中找不到任何Word文件")
@@ -471,55 +592,48 @@ class WordResourceTool:
                 self.logger.error(f"創建輸出目錄失敗: {e}")
                 return False
             
-            # 提取所有Word文件資訊
-            data_list = []
+            # 提取所有Word文件資訊，直接按欄位收集
+            folders = []
+            filenames = []
+            titles = []
             for word_file_path, folder_name in word_files_with_folder:
-                try:
-                    filename = word_file_path.name
-                    title = filename.replace('.docx', '').replace('.doc', '')
-                    
-                    docx_info = {
-                        '資料夾': folder_name,
-                        'docx文件名': filename,
-                        '標題名稱': title,
-                        '題庫資源ID': "",  # 空白
-                        '資源創建時間': "",  # 空白
-                        '題庫編號': "",  # 空白
-                        '題庫創建時間': "",  # 空白
-                        '題庫標題': title,  # 同標題名稱
-                        '標題修改時間': "",  # 空白
-                        '識別完成保存時間': ""  # 空白
-                    }
-                    data_list.append(docx_info)
-                    self.logger.info(f"處理文件成功: {filename} (資料夾: {folder_name})")
-                    
-                except Exception as e:
-                    self.logger.error(f"處理文件時發生錯誤 {word_file_path}: {e}")
-                    print(f"⚠️ 跳過文件: {word_file_path} (錯誤: {e})")
-                    continue
-            
-            if not data_list:
-                print("❌ 無法提取任何有效資料")
-                return False
+                filename = word_file_path.name
+                folders.append(folder_name)
+                filenames.append(filename)
+                titles.append(filename.replace('.docx', '').replace('.doc', ''))
+                self.logger.debug("處理文件成功: %s (資料夾: %s)", filename, folder_name)
             
             # 創建DataFrame並進行自然排序
+            _import_pandas()
             try:
-                import pandas as pd
                 import natsort
             except ImportError:
                 print("正在安裝所需套件...")
-                os.system("pip3 install pandas openpyxl natsort")
-                import pandas as pd
+                os.system("pip3 install natsort")
                 import natsort
             
-            df = pd.DataFrame(data_list)
+            # 空白欄位以純量傳入，由pandas廣播；題庫標題同標題名稱
+            df = pd.DataFrame({
+                '資料夾': folders,
+                'docx文件名': filenames,
+                '標題名稱': titles,
+                '題庫資源ID': "",
+                '資源創建時間': "",
+                '題庫編號': "",
+                '題庫創建時間': "",
+                '題庫標題': titles,
+                '標題修改時間': "",
+                '識別完成保存時間': ""
+            })
             
             # 按標題名稱自然排序（支援中文數字）
             if not df.empty and '標題名稱' in df.columns:
                 # 先轉換中文數字為阿拉伯數字
-                converted_titles = df['標題名稱'].astype(str).apply(convert_chinese_numbers_to_digits)
-                # 使用轉換後的標題進行自然排序
-                sorted_indices = natsort.index_natsorted(converted_titles)
+                converted_titles = convert_chinese_numbers_series(df['標題名稱'])
+                # 每個標題只產生一次自然排序鍵，再以內建sorted排序索引
+                natural_key = natsort.natsort_keygen(alg=natsort.ns.INT)
+                sort_keys = [natural_key(t) for t in converted_titles]
+                sorted_indices = sorted(range(len(sort_keys)), key=sort_keys.__getitem__)
                 df = df.iloc[sorted_indices].reset_index(drop=True)
                 print("✅ 已按標題名稱進行自然排序")
             
@@ -530,9 +644,9 @@ class WordResourceTool:
             
             # 儲存為Excel檔案
             try:
-                df.to_excel(excel_path, index=False, engine='openpyxl')
+                _fast_to_excel(df, excel_path)
                 print(f"✅ 已生成最新todolist: {excel_path}")
-                print(f"📊 包含 {len(data_list)} 筆資料")
+                print(f"📊 包含 {len(df)} 筆資料")
                 self.logger.info(f"成功儲存Excel文件: {excel_path}")
                 
                 # 顯示前5筆資料作為預覽
@@ -586,23 +700,28 @@ class WordResourceTool:
     
     def ensure_all_resources_uploaded(self, excel_path):
         """確保所有資源都已上傳，如果沒有則自動上傳"""
+        _import_pandas()
         try:
-            # 讀取Excel文件
-            df = pd.read_excel(excel_path)
+            # 讀取Excel文件（只讀取題庫資源ID欄位，並直接以字串型別載入）
+            df = _read_excel(
+                excel_path,
+                usecols=lambda col: col == '題庫資源ID',
+                dtype={'題庫資源ID': 'string'}
+            )
             
             # 檢查題庫資源ID欄位
             if '題庫資源ID' not in df.columns:
                 print("❌ Excel文件缺少'題庫資源ID'欄位")
                 return False
             
-            # 檢查哪些資源需要上傳（沒有資源ID的）
-            need_upload = df[pd.isna(df['題庫資源ID']) | (df['題庫資源ID'] == '')]
+            # 檢查哪些資源需要上傳（沒有資源ID的），只計算數量
+            need_upload_count = int((df['題庫資源ID'].fillna('') == '').sum())
             
-            if len(need_upload) == 0:
+            if need_upload_count == 0:
                 print("✅ 所有資源都已有ID，跳過資源上傳步驟")
                 return True
             
-            print(f"⚠️ 發現 {len(need_upload)} 個資源尚未上傳，開始自動上傳...")
+            print(f"⚠️ 發現 {need_upload_count} 個資源尚未上傳，開始自動上傳...")
             
             # 調用現有的資源上傳邏輯
             success = self.process_excel(excel_path)
@@ -619,6 +738,34 @@ class WordResourceTool:
             print(f"❌ 檢查資源上傳狀態時發生錯誤: {e}")
             return False
     
+    def close_driver(self):
+        """關閉selenium會話（程式結束時也會自動呼叫）"""
+        if self.current_driver:
+            try:
+                self.current_driver.quit()
+                self.logger.info("已關閉selenium會話")
+            except:
+                pass
+            self.current_driver = None
+        self._driver_cookies = None
+    
+    def get_driver_cookies(self, refresh=False):
+        """取得瀏覽器cookies（requests格式），DRIVER_COOKIE_CACHE_SECONDS秒內重複使用快取"""
+        with self._driver_cookie_lock:
+            if (refresh or self._driver_cookies is None
+                    or time.monotonic() - self._driver_cookies_at >= DRIVER_COOKIE_CACHE_SECONDS):
+                selenium_cookies = self.current_driver.get_cookies()
+                self.logger.info(f"獲取到 {len(selenium_cookies)} 個cookies")
+                self._driver_cookies = {cookie['name']: cookie['value'] for cookie in selenium_cookies}
+                self._driver_cookies_at = time.monotonic()
+                
+                # 記錄主要的認證相關cookies
+                auth_cookies = ['PHPSESSID', 'sessionid', 'csrftoken', 'auth_token', 'access_token']
+                for cookie_name in auth_cookies:
+                    if cookie_name in self._driver_cookies:
+                        self.logger.info(f"找到認證cookie: {cookie_name}")
+            return self._driver_cookies
+    
     def setup_driver_with_cookies(self):
         """為新建的driver設置cookies並訪問首頁"""
         try:
@@ -626,10 +773,8 @@ class WordResourceTool:
             self.logger.info("設置瀏覽器cookies...")
             self.current_driver.get(self.base_url)
             
-            # 將cookie字符串解析並添加到driver
-            cookies = dict(item.split("=", 1) for item in self.cookie_string.split("; "))
-            
-            for name, value in cookies.items():
+            # 將已解析的cookies添加到driver
+            for name, value in self._cookies_dict.items():
                 try:
                     self.current_driver.add_cookie({
                         'name': name,
@@ -650,6 +795,21 @@ class WordResourceTool:
             self.logger.exception(f"設置瀏覽器cookies時發生錯誤: {e}")
             return False
     
+    def find_login_element(self, driver, selectors, timeout, clickable=False):
+        """以逗號合併的單一CSS選擇器等待任一候選元素出現，再依清單順序挑選，返回(元素, 選擇器)"""
+        condition = EC.element_to_be_clickable if clickable else EC.presence_of_element_located
+        try:
+            WebDriverWait(driver, timeout).until(condition((By.CSS_SELECTOR, ", ".join(selectors))))
+        except TimeoutException:
+            return None, None
+        
+        # 頁面已載入，依優先順序立即查找，不再逐一等待
+        for selector in selectors:
+            for element in driver.find_elements(By.CSS_SELECTOR, selector):
+                if not clickable or (element.is_displayed() and element.is_enabled()):
+                    return element, selector
+        return None, None
+    
     def perform_login(self, driver):
         """執行登入流程"""
         self.logger.info("=== 開始登入流程 ===")
@@ -662,12 +822,6 @@ class WordResourceTool:
             driver.get(LOGIN_URL)
             
             # 等待頁面加載
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
-            from selenium.webdriver.common.by import By
-            from selenium.webdriver.common.keys import Keys
-            from selenium.common.exceptions import TimeoutException
-            
             WebDriverWait(driver, 10).until(
                 lambda d: d.execute_script('return document.readyState') == 'complete'
             )
@@ -715,20 +869,11 @@ class WordResourceTool:
                 'input[placeholder*="用戶"]', 'input[placeholder*="使用者"]'
             ]
             
-            username_field = None
-            for selector in username_selectors:
-                try:
-                    username_field = WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    self.logger.info(f"找到用戶名欄位: {selector}")
-                    break
-                except TimeoutException:
-                    continue
-            
+            username_field, selector = self.find_login_element(driver, username_selectors, 10)
             if not username_field:
                 self.logger.error("找不到用戶名輸入欄位")
                 return False
+            self.logger.info(f"找到用戶名欄位: {selector}")
             
             username_field.clear()
             username_field.send_keys(USERNAME)
@@ -740,20 +885,11 @@ class WordResourceTool:
                 'input[placeholder*="密碼"]', 'input[placeholder*="密码"]'
             ]
             
-            password_field = None
-            for selector in password_selectors:
-                try:
-                    password_field = WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    self.logger.info(f"找到密碼欄位: {selector}")
-                    break
-                except TimeoutException:
-                    continue
-            
+            password_field, selector = self.find_login_element(driver, password_selectors, 10)
             if not password_field:
                 self.logger.error("找不到密碼輸入欄位")
                 return False
+            self.logger.info(f"找到密碼欄位: {selector}")
             
             password_field.clear()
             password_field.send_keys(PASSWORD)
@@ -762,23 +898,18 @@ class WordResourceTool:
             self.logger.info("尋找提交按鈕...")
             submit_selectors = [
                 'button[type="submit"]', 'input[type="submit"]', 
-                '.login-btn', '.btn-login', 'button:contains("登入")',
-                'button:contains("登录")', 'button:contains("Login")',
+                '.login-btn', '.btn-login',
                 'button[class*="submit"]', 'button[class*="login"]'
             ]
             
-            submit_button = None
-            for selector in submit_selectors:
-                try:
-                    submit_button = WebDriverWait(driver, 5).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    self.logger.info(f"找到提交按鈕: {selector}")
-                    break
-                except TimeoutException:
-                    continue
-            
+            submit_button, selector = self.find_login_element(driver, submit_selectors, 5, clickable=True)
+            if not submit_button:
+                # CSS不支援:contains()，改以XPath依按鈕文字尋找
+                selector = "//button[contains(., '登入') or contains(., '登录') or contains(., 'Login')]"
+                buttons = driver.find_elements(By.XPATH, selector)
+                submit_button = next((b for b in buttons if b.is_displayed() and b.is_enabled()), None)
             if submit_button:
+                self.logger.info(f"找到提交按鈕: {selector}")
                 submit_button.click()
                 self.logger.info("已點擊提交按鈕")
             else:
@@ -808,19 +939,56 @@ class WordResourceTool:
     
     def process_library_excel(self, excel_path):
         """處理Excel文件，逐行執行Word題庫上傳流程"""
+        _import_pandas()
+        df = None
+        # 每行的結果先附加到旁路進度檔，每EXCEL_FLUSH_EVERY行才整份寫回Excel一次
+        dirty_rows = set()
+        progress_path = self.progress_path(excel_path)
+        
+        def flush_excel():
+            """把已處理的行寫回Excel，成功後刪除旁路進度檔；沒有待寫入的行時不動作"""
+            if not dirty_rows:
+                return
+            _replace_excel(df, excel_path)
+            self.logger.info(f"Excel已更新: 寫入 {len(dirty_rows)} 行處理結果")
+            dirty_rows.clear()
+            if os.path.exists(progress_path):
+                os.remove(progress_path)
+        
         try:
             # 讀取Excel文件
-            df = pd.read_excel(excel_path)
+            df = _read_excel(excel_path)
             print(f"讀取到 {len(df)} 筆資料")
             
             # 確認所需欄位存在
-            required_columns = ['題庫資源ID', '題庫標題', '題庫編號', '題庫創建時間']
+            required_columns = ['docx文件名', '題庫資源ID', '題庫標題', '題庫編號', '題庫創建時間']
             missing_columns = [col for col in required_columns if col not in df.columns]
             if missing_columns:
                 print(f"Excel文件缺少必要欄位: {missing_columns}")
                 print(f"現有欄位: {list(df.columns)}")
                 return False
             
+            # 先套用上次中斷時尚未寫回Excel的結果
+            self.apply_saved_progress(df, excel_path)
+            
+            # 題庫編號在載入時一次轉為整數字串，迴圈中不再逐行轉換
+            df['題庫編號'] = _id_strings(df['題庫編號'])
+            
+            # 會寫入的欄位先確保存在，並預先計算欄位位置；read_excel的索引即為列位置，寫入時以iat定位
+            for column in ('題庫創建時間', '標題修改時間', '識別完成保存時間'):
+                if column not in df.columns:
+                    df[column] = None
+            col_pos = {column: i for i, column in enumerate(df.columns)}
+            
+            def record_progress(index, updates):
+                for column, value in updates.items():
+                    df.iat[index, col_pos[column]] = value
+                self.append_progress(progress_path, index, df.iat[index, col_pos['docx文件名']], updates)
+                dirty_rows.add(index)
+            
+            # 程式異常結束時仍確保結果寫回Excel
+            atexit.register(flush_excel)
+            
             # 檢查並刷新Cookie
             print("🔍 檢查認證狀態...")
             if not self.check_and_refresh_cookie():
@@ -840,19 +1008,47 @@ class WordResourceTool:
             else:
                 print("✅ 使用現有瀏覽器會話")
             
+            # 已有題庫編號、只差修改標題的行不需要瀏覽器，先並行送出標題修改請求
+            title_only = (
+                _filled_mask(df['題庫資源ID']) & _filled_mask(df['題庫編號']) & _filled_mask(df['題庫標題'])
+            )
+            if '標題修改時間' in df.columns:
+                title_only &= ~_filled_mask(df['標題修改時間'])
+            title_rows = df.index[title_only]
+            if len(title_rows):
+                print(f"\n🔄 並行修改 {len(title_rows)} 個題庫標題（同時 {TITLE_UPDATE_CONCURRENCY} 個）")
+                with ThreadPoolExecutor(max_workers=TITLE_UPDATE_CONCURRENCY) as pool:
+                    futures = {
+                        pool.submit(self.update_library_title, df.at[index, '題庫編號'], df.at[index, '題庫標題']): index
+                        for index in title_rows
+                    }
+                    for future in as_completed(futures):
+                        modify_time = future.result()
+                        if modify_time:
+                            record_progress(futures[future], {'標題修改時間': str(modify_time)})
+            
+            # 欄位位置只計算一次（itertuples的第0欄為索引），缺少的選用欄位以預設值代替
+            cols = {name: i for i, name in enumerate(df.columns, start=1)}
+            
+            def cell(row, name, default=''):
+                pos = cols.get(name)
+                return row[pos] if pos else default
+            
             # 逐行處理
-            for index, row in df.iterrows():
-                print(f"\n=== 處理第 {index + 1} 行: {row.get('標題名稱', '未知')} ===")
+            for row in df.itertuples(index=True, name=None):
+                index = row[0]
+                library_title = row[cols['題庫標題']]
+                print(f"\n=== 處理第 {index + 1} 行: {cell(row, '標題名稱', '未知')} ===")
                 
                 # 快速檢查各欄位是否為空
-                upload_id = row.get('題庫資源ID', '')
-                lib_id = row.get('題庫編號', '')
-                title_modify_time = row.get('標題修改時間', '')
-                save_time = row.get('識別完成保存時間', '')
+                upload_id = row[cols['題庫資源ID']]
+                lib_id = row[cols['題庫編號']]
+                title_modify_time = cell(row, '標題修改時間')
+                save_time = cell(row, '識別完成保存時間')
                 
                 # 轉換為字符串並檢查空值
                 upload_id = str(upload_id).strip() if upload_id and str(upload_id).lower() != 'nan' else ''
-                lib_id = str(lib_id).strip() if lib_id and str(lib_id).lower() != 'nan' else ''
+                lib_id = '' if pd.isna(lib_id) else lib_id
                 title_modify_time = str(title_modify_time).strip() if title_modify_time and str(title_modify_time).lower() != 'nan' else ''
                 save_time = str(save_time).strip() if save_time and str(save_time).lower() != 'nan' else ''
                 
@@ -869,28 +1065,24 @@ class WordResourceTool:
                         print(f"❌ 無法導航到題庫列表頁面")
                         continue
                     
-                    result = create_library(self.current_driver, row.get('題庫標題'), self.logger)
+                    result = create_library(self.current_driver, library_title, self.logger)
                     if result:
                         lib_id, create_time = result
-                        df.at[index, '題庫編號'] = str(lib_id)
-                        df.at[index, '題庫創建時間'] = str(create_time)
-                        df.to_excel(excel_path, index=False)
+                        record_progress(index, {'題庫編號': str(lib_id), '題庫創建時間': str(create_time)})
                         print(f"✅ 題庫創建成功: ID={lib_id}")
                     else:
                         print(f"❌ 題庫創建失敗，跳過")
                         continue
                 else:
-                    lib_id = lib_id.split('.')[0]  # 移除小數點
                     print(f"✅ 使用現有題庫ID: {lib_id}")
                 
                 # 3. 檢查標題修改時間
                 if not title_modify_time:
-                    if row.get('題庫標題'):
-                        print(f"🔄 修改題庫標題: {row['題庫標題']}")
-                        modify_time = self.update_library_title(lib_id, row['題庫標題'])
+                    if library_title:
+                        print(f"🔄 修改題庫標題: {library_title}")
+                        modify_time = self.update_library_title(lib_id, library_title)
                         if modify_time:
-                            df.at[index, '標題修改時間'] = str(modify_time)
-                            df.to_excel(excel_path, index=False)
+                            record_progress(index, {'標題修改時間': str(modify_time)})
                             print(f"✅ 標題修改完成")
                         else:
                             print(f"⚠️ 標題修改失敗，繼續流程")
@@ -904,16 +1096,14 @@ class WordResourceTool:
                     import_url = f"{self.base_url}/subject-lib/{lib_id}/import?mode=word"
                     self.current_driver.get(import_url)
                     
-                    from selenium.webdriver.support.ui import WebDriverWait
                     WebDriverWait(self.current_driver, 15).until(
                         lambda d: d.execute_script('return document.readyState') == 'complete'
                     )
                     time.sleep(3)
                     
                     if self.word_convert_and_identify_via_api(lib_id, upload_id):
-                        save_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        df.at[index, '識別完成保存時間'] = str(save_time)
-                        df.to_excel(excel_path, index=False)
+                        save_time = _now_str()
+                        record_progress(index, {'識別完成保存時間': str(save_time)})
                         print(f"✅ 解析、識別和儲存完成")
                     else:
                         print(f"❌ 解析、識別和儲存失敗")
@@ -925,6 +1115,9 @@ class WordResourceTool:
                 
                 print(f"✅ 第 {index + 1} 行處理完成")
                 
+                if len(dirty_rows) >= EXCEL_FLUSH_EVERY:
+                    flush_excel()
+                
                 # 短暫延遲
                 time.sleep(2)
             
@@ -936,13 +1129,10 @@ class WordResourceTool:
             print(f"處理Excel文件時發生錯誤: {e}")
             return False
         finally:
+            flush_excel()
+            atexit.unregister(flush_excel)
             # 關閉selenium會話
-            if self.current_driver:
-                try:
-                    self.current_driver.quit()
-                    self.logger.info("已關閉selenium會話")
-                except:
-                    pass
+            self.close_driver()
     
     def word_convert_and_identify_via_api(self, lib_id, upload_id):
         """使用 API 直接調用解析、識別和儲存，完整三步流程"""
@@ -1198,10 +1388,6 @@ const done = arguments[0];
             self.current_driver.get(subject_libs_url)
             
             # 等待頁面完全加載
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
-            from selenium.webdriver.common.by import By
-            
             WebDriverWait(self.current_driver, 15).until(
                 lambda d: d.execute_script('return document.readyState') == 'complete'
             )
@@ -1243,50 +1429,47 @@ const done = arguments[0];
         payload = {"title": new_title}
         
         try:
-            # 從selenium driver獲取cookies
-            selenium_cookies = self.current_driver.get_cookies()
-            self.logger.info(f"獲取到 {len(selenium_cookies)} 個cookies")
-            
-            # 轉換為requests格式
-            cookies = {}
-            for cookie in selenium_cookies:
-                cookies[cookie['name']] = cookie['value']
-            
-            # 記錄主要的認證相關cookies
-            auth_cookies = ['PHPSESSID', 'sessionid', 'csrftoken', 'auth_token', 'access_token']
-            for cookie_name in auth_cookies:
-                if cookie_name in cookies:
-                    self.logger.info(f"找到認證cookie: {cookie_name}")
-            
-            # 發送API請求
+            # 發送API請求（共用連線池；快取的cookies被拒時重新讀取瀏覽器cookies再試一次）
             self.logger.info(f"發送PUT請求到: {url}")
             self.logger.info(f"請求payload: {payload}")
             
-            resp = requests.put(
-                url, 
-                headers=headers, 
-                json=payload, 
-                cookies=cookies,
-                timeout=30
-            )
+            for attempt in range(2):
+                resp = self.http.put(
+                    url, 
+                    headers=headers, 
+                    json=payload, 
+                    cookies=self.get_driver_cookies(refresh=attempt > 0),
+                    timeout=30
+                )
+                if resp.status_code not in (401, 403) or attempt:
+                    break
+                # 認證失效：之後的Cookie檢查不再沿用先前的驗證結果
+                self.last_cookie_update = None
+                self._auth_checked_at = None
+                self.logger.warning(f"API回應 {resp.status_code}，重新讀取瀏覽器cookies後重試")
+            
+            self.logger.info("API回應狀態碼: %s", resp.status_code)
             
-            self.logger.info(f"API回應狀態碼: {resp.status_code}")
-            self.logger.info(f"API回應Headers: {dict(resp.headers)}")
+            # 成功且為JSON回應時直接完成，不解碼回應內容
+            if resp.status_code == 200 and 'json' in resp.headers.get('Content-Type', ''):
+                modify_time = _now_str()
+                self.logger.info("標題修改成功: %s", modify_time)
+                print(f"✅ 標題修改成功: {new_title}")
+                return modify_time
             
-            # 記錄回應內容（前500字符）
+            # 其他情況才解碼回應內容；Headers與內容只在DEBUG層級記錄（前500字符）
             response_text = resp.text
-            if len(response_text) > 500:
-                self.logger.info(f"API回應內容: {response_text[:500]}...")
-            else:
-                self.logger.info(f"API回應內容: {response_text}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("API回應Headers: %s", dict(resp.headers))
+                self.logger.debug("API回應內容: %s%s", response_text[:500], "..." if len(response_text) > 500 else "")
             
             # 檢查回應是否為JSON
             try:
                 response_json = resp.json()
-                self.logger.info(f"API回應JSON: {response_json}")
+                self.logger.debug("API回應JSON: %s", response_json)
                 
                 if resp.status_code == 200:
-                    modify_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    modify_time = _now_str()
                     self.logger.info(f"標題修改成功: {modify_time}")
                     print(f"✅ 標題修改成功: {new_title}")
                     return modify_time
@@ -1304,7 +1487,7 @@ const done = arguments[0];
                 elif resp.status_code == 200:
                     # 有些API可能返回純文本成功信息
                     self.logger.info("API可能成功（非JSON回應）")
-                    modify_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    modify_time = _now_str()
                     print(f"✅ 標題修改可能成功: {new_title}")
                     return modify_time
                 else:
@@ -1326,10 +1509,11 @@ const done = arguments[0];
             return False
     
     def process_excel(self, excel_path):
-        """處理Excel文件，逐行創建資源"""
+        """處理Excel文件，並行創建未上傳的資源"""
+        _import_pandas()
         try:
             # 讀取Excel文件
-            df = pd.read_excel(excel_path)
+            df = _read_excel(excel_path)
             print(f"讀取到 {len(df)} 筆資料")
             
             # 確認所需欄位存在
@@ -1339,6 +1523,9 @@ const done = arguments[0];
                     print(f"Excel文件缺少必要欄位: {col}")
                     return False
             
+            # 套用上次中斷時尚未寫回Excel的結果
+            self.apply_saved_progress(df, excel_path)
+            
             # 檢查是否所有資源都已經有ID
             has_resource_id = df['題庫資源ID'].notna() & (df['題庫資源ID'] != '')
             if has_resource_id.all():
@@ -1346,67 +1533,60 @@ const done = arguments[0];
                 self.logger.info("所有資源都已創建，無需處理")
                 return True
             
-            # 逐行處理
-            for index, row in df.iterrows():
-                print(f"\n=== 處理第 {index + 1} 行: {row['docx文件名']} ===")
+            # 找出需要創建資源的行（缺少題庫資源ID或創建時間），已完成的行不再逐行檢查
+            todo_mask = ~has_resource_id | df['資源創建時間'].isna()
+            done_count = len(df) - int(todo_mask.sum())
+            if done_count:
+                print(f"已有 {done_count} 行資源存在，略過")
+            
+            # 每個資料夾只列舉一次，以集合判斷Word文件是否存在（取代逐行stat）
+            dir_entries = {}
+            
+            def file_exists(path):
+                directory, name = os.path.split(path)
+                if directory not in dir_entries:
+                    try:
+                        with os.scandir(directory) as it:
+                            dir_entries[directory] = {entry.name for entry in it if entry.is_file()}
+                    except OSError:
+                        dir_entries[directory] = set()
+                return name in dir_entries[directory]
+            
+            pending_rows = []
+            columns = ['資料夾', 'docx文件名', '標題名稱']
+            for index, folder, docx_name, title in df.loc[todo_mask, columns].itertuples(index=True, name=None):
+                # 構建Word文件路徑
+                docx_file_path = self.build_docx_path(folder, docx_name)
+                if not docx_file_path or not file_exists(docx_file_path):
+                    print(f"\n=== 第 {index + 1} 行: {docx_name} ===")
+                    print(f"找不到Word文件: {docx_file_path}")
+                    continue
+                pending_rows.append((index, docx_file_path, title))
+            
+            if pending_rows:
+                # 並行上傳前統一檢查一次Cookie
+                if not self.check_and_refresh_cookie():
+                    self.logger.error("Cookie驗證和刷新均失敗")
+                    print("❌ 認證失敗，請檢查登入憑證")
+                    return False
                 
-                # 檢查是否已有題庫資源ID和創建時間
-                if pd.isna(row['題庫資源ID']) or pd.isna(row['資源創建時間']) or row['題庫資源ID'] == '':
-                    # 構建Word文件路徑
-                    docx_file_path = self.build_docx_path(row['資料夾'], row['docx文件名'])
-                    if not docx_file_path or not os.path.exists(docx_file_path):
-                        print(f"找不到Word文件: {docx_file_path}")
-                        continue
-                    
-                    print(f"準備創建資源: {docx_file_path}")
-                    print(f"資源標題: {row['標題名稱']}")
+                print(f"\n🚀 開始並行上傳 {len(pending_rows)} 個資源（同時 {UPLOAD_CONCURRENCY} 個）")
+                failed_rows = asyncio.run(self.upload_resources_concurrently(df, pending_rows, excel_path))
+                
+                if failed_rows:
+                    print(f"\n⚠️ 共 {len(failed_rows)} 個資源創建失敗:")
+                    for index in failed_rows:
+                        print(f"  - 第 {index + 1} 行: {df.at[index, 'docx文件名']}")
                     
-                    # 創建資源
+                    # 並行上傳結束後統一詢問一次是否略過失敗的資源
                     try:
-                        resource_id, create_time = self.create_resource(docx_file_path, row['標題名稱'])
-                        
-                        if resource_id:
-                            # 即時更新Excel (确保数据类型兼容)
-                            df.at[index, '題庫資源ID'] = str(resource_id)
-                            df.at[index, '資源創建時間'] = str(create_time)
-                            df.to_excel(excel_path, index=False)
-                            
-                            print(f"✅ 資源創建成功: ID={resource_id}, 創建時間={create_time}")
-                            self.logger.info(f"Excel已更新: 資源ID={resource_id}, 創建時間={create_time}")
-                            
-                            # 短暫延遲
-                            time.sleep(2)
-                        else:
-                            print(f"❌ 資源創建失敗: {row['docx文件名']}")
-                            
-                            # 詢問用戶是否繼續
-                            try:
-                                choice = input("資源創建失敗，是否繼續下一個？(y/N): ").strip().lower()
-                                if choice not in ['y', 'yes', '是']:
-                                    print("用戶選擇停止處理")
-                                    return False
-                            except KeyboardInterrupt:
-                                print("\n用戶中斷操作")
-                                return False
-                            continue
-                            
-                    except Exception as e:
-                        print(f"❌ 創建資源時發生錯誤: {e}")
-                        self.logger.error(f"創建資源失敗: {e}")
-                        
-                        # 詢問用戶是否繼續
-                        try:
-                            choice = input("創建資源時發生錯誤，是否繼續下一個？(y/N): ").strip().lower()
-                            if choice not in ['y', 'yes', '是']:
-                                print("用戶選擇停止處理")
-                                return False
-                        except KeyboardInterrupt:
-                            print("\n用戶中斷操作")
+                        choice = input("部分資源創建失敗，是否略過並繼續？(y/N): ").strip().lower()
+                        if choice not in ['y', 'yes', '是']:
+                            print("用戶選擇停止處理")
                             return False
-                        continue
-                else:
-                    resource_id = row['題庫資源ID']
-                    print(f"資源已存在，ID: {resource_id}")
+                    except KeyboardInterrupt:
+                        print("\n用戶中斷操作")
+                        return False
             
             print(f"\n🎉 處理完成！共處理 {len(df)} 筆資料")
             return True
@@ -1417,12 +1597,140 @@ const done = arguments[0];
             return False
         finally:
             # 關閉selenium會話
-            if self.current_driver:
+            self.close_driver()
+    
+    def progress_path(self, excel_path):
+        """旁路進度檔案（JSON Lines，每行一筆更新）的路徑"""
+        return f"{excel_path}.progress.jsonl"
+    
+    def append_progress(self, progress_path, index, docx_name, updates):
+        """以附加方式記錄一筆更新，不重寫整個進度檔案"""
+        record = {'index': int(index), 'docx文件名': docx_name, **updates}
+        with open(progress_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    
+    def apply_saved_progress(self, df, excel_path):
+        """套用上次中斷時尚未寫回Excel的處理結果（資源上傳或題庫處理），返回套用筆數"""
+        progress_path = self.progress_path(excel_path)
+        if not os.path.exists(progress_path):
+            return 0
+        
+        records = []
+        try:
+            with open(progress_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # 中斷時可能留下寫到一半的最後一行，略過即可
+                        continue
+        except OSError as e:
+            self.logger.warning(f"讀取進度檔案失敗: {e}")
+            return 0
+        
+        applied_rows = set()
+        for record in records:
+            index = record.pop('index')
+            docx_name = record.pop('docx文件名')
+            # 確認行號與檔名仍對應，避免Excel已被修改時寫錯行
+            if index in df.index and df.at[index, 'docx文件名'] == docx_name:
+                for column, value in record.items():
+                    df.at[index, column] = value
+                applied_rows.add(index)
+        applied = len(applied_rows)
+        
+        if applied:
+            _replace_excel(df, excel_path)
+            print(f"♻️ 已從上次中斷的進度恢復 {applied} 筆資料")
+            self.logger.info(f"從進度檔案恢復 {applied} 筆資料: {progress_path}")
+        os.remove(progress_path)
+        return applied
+    
+    async def upload_resources_concurrently(self, df, pending_rows, excel_path):
+        """以asyncio並行上傳資源，每EXCEL_FLUSH_EVERY筆由背景執行緒寫回一次Excel，返回失敗的行索引"""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+        executor = ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY)
+        # 單一寫入執行緒：依序寫回Excel，上傳不必等待寫檔完成
+        writer = ThreadPoolExecutor(max_workers=1)
+        pending_writes = []
+        # 本批次所有成功結果都附加在旁路進度檔，保留到最後一次寫回完成為止
+        progress_path = self.progress_path(excel_path)
+        unflushed = 0
+        
+        def write_excel(snapshot, count):
+            """寫回Excel，與上傳並行執行於寫入執行緒"""
+            _replace_excel(snapshot, excel_path)
+            self.logger.info(f"Excel已更新: 寫入 {count} 筆新資源ID")
+        
+        def flush_excel():
+            """將目前DataFrame的快照交給寫入執行緒"""
+            nonlocal unflushed
+            if unflushed:
+                pending_writes.append(writer.submit(write_excel, df.copy(), unflushed))
+                unflushed = 0
+        
+        def finish_writes():
+            """送出最後一次寫回並等待完成，全部成功才刪除旁路進度檔"""
+            flush_excel()
+            writer.shutdown(wait=True)
+            all_written = True
+            for future in pending_writes:
                 try:
-                    self.current_driver.quit()
-                    self.logger.info("已關閉selenium會話")
-                except:
-                    pass
+                    future.result()
+                except Exception as e:
+                    all_written = False
+                    self.logger.error(f"寫回Excel失敗: {e}")
+            pending_writes.clear()
+            if all_written and os.path.exists(progress_path):
+                os.remove(progress_path)
+        
+        # 程式異常結束時仍確保結果寫回Excel
+        atexit.register(finish_writes)
+        
+        # 欄位位置只計算一次；read_excel的索引即為列位置，寫入時以iat定位
+        id_pos = df.columns.get_loc('題庫資源ID')
+        time_pos = df.columns.get_loc('資源創建時間')
+        name_pos = df.columns.get_loc('docx文件名')
+        
+        async def upload_one(index, docx_file_path, title):
+            async with semaphore:
+                print(f"準備創建資源: {docx_file_path} (標題: {title})")
+                resource_id, create_time = await loop.run_in_executor(
+                    executor, self.create_resource, docx_file_path, title, False
+                )
+            return index, resource_id, create_time
+        
+        tasks = [upload_one(index, docx_file_path, title) for index, docx_file_path, title in pending_rows]
+        failed_rows = []
+        
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, resource_id, create_time = await next_done
+                
+                if resource_id:
+                    # 更新DataFrame (确保数据类型兼容)，結果先附加到旁路進度檔
+                    df.iat[index, id_pos] = str(resource_id)
+                    df.iat[index, time_pos] = str(create_time)
+                    self.append_progress(progress_path, index, df.iat[index, name_pos], {
+                        '題庫資源ID': str(resource_id),
+                        '資源創建時間': str(create_time)
+                    })
+                    
+                    print(f"✅ 第 {index + 1} 行資源創建成功: ID={resource_id}, 創建時間={create_time}")
+                    
+                    unflushed += 1
+                    if unflushed >= EXCEL_FLUSH_EVERY:
+                        flush_excel()
+                else:
+                    print(f"❌ 第 {index + 1} 行資源創建失敗: {df.iat[index, name_pos]}")
+                    failed_rows.append(index)
+        finally:
+            executor.shutdown(wait=True)
+            finish_writes()
+            atexit.unregister(finish_writes)
+        
+        return sorted(failed_rows)
     
     def run(self):
         """主要執行流程"""
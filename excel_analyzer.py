@@ -8,6 +8,9 @@ import pandas as pd
 import os
 import sys
 
+# 文字儲存格中有效整數ID的寫法（與 int() 相同，允許前後空白與正負號）
+_INT_TEXT_PATTERN = r'\s*[+-]?\d+\s*'
+
 def analyze_excel_file(excel_path):
     """分析 Excel 檔案並檢查問題"""
     print(f"📋 分析檔案: {os.path.basename(excel_path)}")
@@ -18,26 +21,25 @@ def analyze_excel_file(excel_path):
         return
     
     try:
-        # 讀取所有 sheets
-        excel_file = pd.ExcelFile(excel_path)
-        print(f"📊 檔案包含 {len(excel_file.sheet_names)} 個 sheet: {', '.join(excel_file.sheet_names)}")
-        
-        # 分析每個 sheet
-        for sheet_name in excel_file.sheet_names:
-            print(f"\n📋 分析 Sheet: {sheet_name}")
-            print("-" * 40)
-            
-            df = pd.read_excel(excel_path, sheet_name=sheet_name)
+        # 開啟一次活頁簿，各 sheet 都從同一個檔案物件解析，不重複開檔
+        with pd.ExcelFile(excel_path, engine='openpyxl') as excel_file:
+            print(f"📊 檔案包含 {len(excel_file.sheet_names)} 個 sheet: {', '.join(excel_file.sheet_names)}")
             
-            if sheet_name == 'Result':
-                analyze_result_sheet(df)
-            elif sheet_name == 'Resource':
-                analyze_resource_sheet(df)
-            elif sheet_name == 'Ori_document':
-                analyze_ori_document_sheet(df)
-            else:
-                print(f"  ℹ️  未知的 sheet 類型，跳過詳細分析")
-                print(f"  📏 形狀: {df.shape}")
+            # 分析每個 sheet
+            for sheet_name in excel_file.sheet_names:
+                print(f"\n📋 分析 Sheet: {sheet_name}")
+                print("-" * 40)
+                
+                # 只有需要詳細分析的 sheet 才載入成 DataFrame，其餘只需形狀，以唯讀工作表逐列掃描
+                if sheet_name == 'Result':
+                    analyze_result_sheet(excel_file.parse(sheet_name))
+                elif sheet_name == 'Resource':
+                    analyze_resource_sheet(excel_file.parse(sheet_name))
+                elif sheet_name == 'Ori_document':
+                    analyze_ori_document_sheet(sheet_shape(excel_file.book[sheet_name]))
+                else:
+                    print(f"  ℹ️  未知的 sheet 類型，跳過詳細分析")
+                    print(f"  📏 形狀: {sheet_shape(excel_file.book[sheet_name])}")
     
     except Exception as e:
         print(f"❌ 讀取檔案時出錯: {e}")
@@ -64,7 +66,7 @@ def analyze_result_sheet(df):
     target_activity = "課程導論與評量方式"
     
     if '名稱' in df.columns:
-        matching_rows = df[df['名稱'].str.contains(target_activity, na=False)]
+        matching_rows = df[df['名稱'].str.contains(target_activity, na=False, regex=False)]
         
         if not matching_rows.empty:
             print(f"  ✅ 找到 {len(matching_rows)} 個匹配的記錄:")
@@ -139,6 +141,15 @@ def check_activity_info(row):
     else:
         print(f"    ⚠️  資源ID為空")
 
+def _integer_mask(series):
+    """整數值的布林遮罩：數值須為整數（12.5、inf 無效），文字須為 int() 可解析的整數寫法（"12.5"、"1e3" 無效）"""
+    coerced = pd.to_numeric(series, errors='coerce')
+    valid = coerced.notna() & (coerced % 1 == 0)
+    if series.dtype == object:
+        is_text = series.map(type) == str
+        valid &= ~is_text | series.where(is_text).str.fullmatch(_INT_TEXT_PATTERN, na=False)
+    return valid
+
 def check_id_fields(df):
     """檢查各種 ID 欄位的有效性"""
     print(f"\n  🔍 檢查 ID 欄位有效性:")
@@ -148,19 +159,14 @@ def check_id_fields(df):
     for col in id_columns:
         if col in df.columns:
             # 統計非空值
-            non_empty = df[col].notna().sum()
+            non_empty = int(df[col].notna().sum())
             total = len(df)
             
-            # 檢查數值有效性
-            numeric_valid = 0
-            if non_empty > 0:
-                for val in df[col].dropna():
-                    try:
-                        if val != '' and str(val).strip() != '':
-                            int(val)
-                            numeric_valid += 1
-                    except:
-                        pass
+            # 檢查數值有效性（須為整數）：整數型欄位的非空值必定有效；其他欄位整欄一次轉換，空字串與非數值轉為NaN
+            if df[col].dtype.kind in 'iub':
+                numeric_valid = non_empty
+            else:
+                numeric_valid = int(_integer_mask(df[col]).sum())
             
             print(f"    {col}: {non_empty}/{total} 非空, {numeric_valid} 個有效數值")
 
@@ -173,7 +179,7 @@ def analyze_resource_sheet(df):
     print(f"\n  🔍 查找包含 '0-2.mp4' 的資源:")
     
     if '檔案路徑' in df.columns:
-        matching_resources = df[df['檔案路徑'].str.contains('0-2.mp4', na=False)]
+        matching_resources = df[df['檔案路徑'].str.contains('0-2.mp4', na=False, regex=False)]
         
         if not matching_resources.empty:
             print(f"    ✅ 找到 {len(matching_resources)} 個匹配的資源:")
@@ -190,23 +196,35 @@ def analyze_resource_sheet(df):
     
     # 檢查資源ID的分配
     if '資源ID' in df.columns:
-        non_empty_ids = df['資源ID'].dropna()
-        if len(non_empty_ids) > 0:
+        assigned_count = int(df['資源ID'].notna().sum())
+        if assigned_count > 0:
             print(f"\n  📊 資源ID統計:")
-            print(f"    已分配ID的資源: {len(non_empty_ids)}")
-            try:
-                # 嘗試轉換為數值類型計算範圍
-                numeric_ids = pd.to_numeric(non_empty_ids, errors='coerce').dropna()
-                if len(numeric_ids) > 0:
-                    print(f"    ID範圍: {int(numeric_ids.min())} - {int(numeric_ids.max())}")
-                else:
-                    print(f"    ID範圍: 無法計算（非數值ID）")
-            except Exception as e:
-                print(f"    ID範圍: 計算錯誤 - {e}")
+            print(f"    已分配ID的資源: {assigned_count}")
+            # 整欄一次轉為數值計算範圍（errors='coerce' 不會拋出例外，非數值轉為NaN並由min/max略過）
+            numeric_ids = pd.to_numeric(df['資源ID'], errors='coerce')
+            if numeric_ids.notna().any():
+                print(f"    ID範圍: {int(numeric_ids.min())} - {int(numeric_ids.max())}")
+            else:
+                print(f"    ID範圍: 無法計算（非數值ID）")
+
+def sheet_shape(worksheet):
+    """逐列掃描唯讀工作表，取得與 read_excel 相同的 (列數, 欄數)，不建立 DataFrame"""
+    cols = 0
+    last_data_row = 0
+    for row_number, row in enumerate(worksheet.iter_rows(values_only=True)):
+        # 去除列尾的空白儲存格後計算寬度
+        width = len(row)
+        while width and row[width - 1] is None:
+            width -= 1
+        cols = max(cols, width)
+        # 第一列為標題列；結尾的全空白列不計入
+        if row_number and width:
+            last_data_row = row_number
+    return (last_data_row, cols)
 
-def analyze_ori_document_sheet(df):
+def analyze_ori_document_sheet(shape):
     """分析 Ori_document sheet"""
-    print(f"  📏 數據形狀: {df.shape}")
+    print(f"  📏 數據形狀: {shape}")
     print(f"  ℹ️  這是原始文檔，包含原始格式的數據")
 
 def main():
@@ -6,17 +6,82 @@
 """
 
 import tkinter as tk
-from tkinter import scrolledtext, messagebox, ttk
-import subprocess
+from tkinter import messagebox, ttk
+import asyncio
+import codecs
 import threading
 import os
+import re
 import sys
-import queue
 import time
-from datetime import datetime
+import collections
+
+# 每次 Tk tick 清空輸出隊列的時間預算（秒），超過則讓出主循環
+OUTPUT_DRAIN_BUDGET = 0.016
+# 無法使用喚醒管道（Windows）時，腳本運行期間輪詢輸出隊列的間隔（毫秒）
+OUTPUT_POLL_MS = 30
+# 輸出停在未換行內容上超過此秒數時，檢查是否為輸入提示
+PROMPT_IDLE_SECONDS = 0.3
+# 終端輸出最多保留的行數，超出時從頂部刪除舊行
+MAX_OUTPUT_LINES = 5000
+
+# 輸入提示指示符；反斜線續行提示與「預設:」格式都已包含在內
+_INPUT_INDICATORS = (
+    '請輸入', '選擇', '確認', '輸入', 'input', 'enter',
+    ': ', '? ', '：', '？', '(y/n)', '[Enter]', '預設:',
+    '(default)', '(Y/n)', '(y/N)', '>>>', 'choice',
+    '或按Enter', '請選擇', 'Select', 'Choose', '\\'
+)
+# 合併為單一忽略大小寫的正則，一次掃描完成所有指示符的檢查
+_PROMPT_RE = re.compile('|'.join(map(re.escape, _INPUT_INDICATORS)), re.IGNORECASE)
+
+# 輸出行樣式關鍵字，組名即文本標籤；同時出現多類時按 _TAG_PRIORITY 取最優先者
+_TAG_RE = re.compile(
+    r'(?P<error>錯誤|ERROR|❌|Error)'
+    r'|(?P<warning>警告|WARNING|⚠️|Warning)'
+    r'|(?P<success>成功|SUCCESS|✅|Success)'
+)
+_TAG_PRIORITY = ('error', 'warning', 'success')
+
+
+def _output_tag(content):
+    """返回輸出行對應的樣式標籤，沒有關鍵字時返回 None"""
+    # 絕大多數行沒有關鍵字，一次 search 即可排除
+    match = _TAG_RE.search(content)
+    if match is None:
+        return None
+    found = {match.lastgroup}
+    if match.lastgroup != 'error':
+        found.update(m.lastgroup for m in _TAG_RE.finditer(content, match.end()))
+    return next(name for name in _TAG_PRIORITY if name in found)
+
+
+class _ScriptProtocol(asyncio.SubprocessProtocol):
+    """子進程協議：stdout 數據轉交終端處理，並記錄輸出關閉與進程結束"""
+    
+    def __init__(self, terminal):
+        self.terminal = terminal
+        loop = asyncio.get_running_loop()
+        self.output_closed = loop.create_future()
+        self.exited = loop.create_future()
+    
+    def pipe_data_received(self, fd, data):
+        self.terminal._on_output(data)
+    
+    def pipe_connection_lost(self, fd, exc):
+        if fd == 1 and not self.output_closed.done():
+            self.terminal._on_output_eof()
+            self.output_closed.set_result(None)
+    
+    def process_exited(self):
+        if not self.exited.done():
+            self.exited.set_result(None)
 
 
 class FinalTerminal:
+    # (腳本路徑, Python 解譯器) -> (命令, 環境變量)，重複執行同一腳本時直接重用
+    _LAUNCH_CACHE = {}
+    
     def __init__(self, parent, task_name, script_path):
         """
         初始化交互式終端執行器
@@ -31,10 +96,21 @@ class FinalTerminal:
         self.script_path = script_path
         self.execution_successful = False
         self.process = None
-        self.output_queue = queue.Queue()
-        self.input_queue = queue.Queue()
+        # 事件循環線程 append、Tk 線程 popleft，deque 的兩端操作本身是線程安全的
+        self.output_queue = collections.deque()
+        # POSIX 下事件循環線程經由此管道喚醒 Tk 處理輸出，Windows 則輪詢隊列
+        self._wake_r = None
+        self._wake_w = None
+        self._wake_pending = False
+        # 後台執行腳本的事件循環
+        self._loop = None
         self.is_running = False
         self.waiting_for_input = False
+        # 最近幾行腳本輸出，供手動啟用輸入時推測提示
+        self._recent_lines = collections.deque(maxlen=4)
+        # 同一秒內重用已格式化的時間戳
+        self._ts_sec = 0
+        self._ts_str = ""
         
         self.create_window()
         self.start_execution()
@@ -79,15 +155,28 @@ class FinalTerminal:
         output_frame = ttk.LabelFrame(main_frame, text="終端輸出", padding=5)
         output_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
         
-        self.output_text = scrolledtext.ScrolledText(output_frame, 
-                                                    height=25, 
-                                                    font=("Consolas", 10),
-                                                    bg="#1e1e1e",
-                                                    fg="#ffffff",
-                                                    insertbackground="#ffffff",
-                                                    selectbackground="#404040",
-                                                    wrap=tk.WORD)
-        self.output_text.pack(fill=tk.BOTH, expand=True)
+        # 終端輸出不自動換行，避免高頻插入時重新計算折行；以水平捲軸查看長行
+        self.output_text = tk.Text(output_frame, 
+                                   height=25, 
+                                   font=("Consolas", 10),
+                                   bg="#1e1e1e",
+                                   fg="#ffffff",
+                                   insertbackground="#ffffff",
+                                   selectbackground="#404040",
+                                   wrap=tk.NONE,
+                                   undo=False,
+                                   autoseparators=False,
+                                   maxundo=0,
+                                   exportselection=False)
+        y_scrollbar = ttk.Scrollbar(output_frame, orient=tk.VERTICAL, command=self.output_text.yview)
+        x_scrollbar = ttk.Scrollbar(output_frame, orient=tk.HORIZONTAL, command=self.output_text.xview)
+        self.output_text.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
+        
+        self.output_text.grid(row=0, column=0, sticky="nsew")
+        y_scrollbar.grid(row=0, column=1, sticky="ns")
+        x_scrollbar.grid(row=1, column=0, sticky="ew")
+        output_frame.rowconfigure(0, weight=1)
+        output_frame.columnconfigure(0, weight=1)
         
         # 配置文本標籤樣式
         self.output_text.tag_configure("error", foreground="#ff6b6b")
@@ -182,19 +271,34 @@ class FinalTerminal:
     
     def append_output(self, text, tag=None):
         """追加輸出文本"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        # 插入時間戳
-        self.output_text.insert(tk.END, f"[{timestamp}] ", "timestamp")
-        
-        # 插入正文
-        if tag:
-            self.output_text.insert(tk.END, f"{text}\n", tag)
-        else:
-            self.output_text.insert(tk.END, f"{text}\n")
+        # 時間戳與正文以單次 insert 寫入
+        self._insert_lines(((text, tag),))
         
+        # 重繪交給 Tk 空閒處理；批量輸出由 process_output 在每個 tick 結束時統一刷新
         self.output_text.see(tk.END)
-        self.window.update_idletasks()
+    
+    def _timestamp(self):
+        """返回 HH:MM:SS 時間戳，秒數變化時才重新格式化"""
+        now = int(time.time())
+        if now != self._ts_sec:
+            self._ts_sec = now
+            self._ts_str = time.strftime("%H:%M:%S", time.localtime(now))
+        return self._ts_str
+    
+    def _insert_lines(self, lines):
+        """以單次 insert 追加多行輸出，lines 為 (text, tag) 列表"""
+        timestamp = self._timestamp()
+        
+        args = []
+        for text, tag in lines:
+            args.extend((f"[{timestamp}] ", "timestamp", f"{text}\n", tag or ()))
+        self.output_text.insert(tk.END, *args)
+    
+    def _trim_output(self):
+        """輸出超過 MAX_OUTPUT_LINES 行時刪除最舊的行"""
+        line_count = int(self.output_text.index('end-1c').split('.')[0])
+        if line_count > MAX_OUTPUT_LINES:
+            self.output_text.delete('1.0', f'{line_count - MAX_OUTPUT_LINES + 1}.0')
     
     def update_input_prompt(self, prompt_text):
         """更新輸入提示"""
@@ -224,12 +328,9 @@ class FinalTerminal:
         self.update_input_prompt("⌨️ 手動啟用輸入 - 請輸入內容或按Enter使用預設值")
         self.append_output("🔓 輸入功能已手動啟用，可以進行輸入", "success")
         
-        # 如果有最後一行輸出包含提示，重新顯示
-        last_lines = self.output_text.get("end-10c linestart", "end-1c").strip().split('\n')
-        if last_lines:
-            last_line = last_lines[-1].strip()
-            if last_line and not last_line.startswith('['):  # 不是時間戳行
-                self.update_input_prompt(f"根據輸出推測: {last_line}")
+        # 如果有最後一行腳本輸出，作為提示重新顯示
+        if self._recent_lines:
+            self.update_input_prompt(f"根據輸出推測: {self._recent_lines[-1].strip()}")
                 
         # 更新按鈕狀態
         self.manual_input_button.config(text="✅ 輸入已啟用", state='disabled')
@@ -244,216 +345,252 @@ class FinalTerminal:
         self.append_output(f"開始執行腳本：{self.script_path}", "success")
         self.status_var.set("運行中...")
         
-        # 在後台線程中執行
-        thread = threading.Thread(target=self._execute_script)
+        # Tk 在喚醒管道可讀時才處理輸出，腳本靜默時不再定時輪詢
+        if sys.platform != 'win32':
+            self._wake_r, self._wake_w = os.pipe()
+            self.window.tk.createfilehandler(self._wake_r, tk.READABLE, self._on_wakeup)
+        
+        # 在後台線程的 asyncio 事件循環中執行，讀寫進程管道都由同一循環處理
+        thread = threading.Thread(target=self._run_event_loop)
         thread.daemon = True
         thread.start()
         
         # 開始處理輸出
         self.process_output()
     
-    def _execute_script(self):
-        """在後台執行腳本"""
+    def _run_event_loop(self):
+        """後台線程入口：建立事件循環並執行腳本直到結束"""
+        # Windows 固定使用 Proactor 循環：以重疊 I/O 等待管道就緒，不需輪詢；
+        # 若全局策略被改為 Selector 循環，子進程管道將無法使用
+        if sys.platform == 'win32':
+            loop = asyncio.ProactorEventLoop()
+        else:
+            loop = asyncio.new_event_loop()
+        self._loop = loop
         try:
+            loop.run_until_complete(self._execute_script())
+        finally:
+            loop.close()
+            # 不會再有新消息，關閉寫端讓 Tk 側讀到 EOF 後註銷處理器
+            if self._wake_w is not None:
+                os.close(self._wake_w)
+    
+    def _post(self, msg_type, content):
+        """事件循環線程送出消息，必要時喚醒 Tk"""
+        self.output_queue.append((msg_type, content))
+        if self._wake_w is not None and not self._wake_pending:
+            self._wake_pending = True
+            os.write(self._wake_w, b'\0')
+    
+    def _on_wakeup(self, fd, mask):
+        """喚醒管道可讀：清空喚醒信號後處理輸出隊列"""
+        if not os.read(fd, 4096):
+            self.window.tk.deletefilehandler(fd)
+            os.close(fd)
+            self._wake_r = None
+        self._wake_pending = False
+        self.process_output()
+    
+    def _launch_spec(self):
+        """返回執行腳本的命令與環境變量"""
+        key = (self.script_path, sys.executable)
+        if key not in self._LAUNCH_CACHE:
             # 判斷腳本類型並構建命令
             if self.script_path.endswith('.py'):
-                cmd = [sys.executable, '-u', self.script_path]
+                cmd = (sys.executable, '-u', self.script_path)
             elif self.script_path.endswith('.sh'):
-                cmd = ['bash', self.script_path]
+                cmd = ('bash', self.script_path)
             else:
-                cmd = [self.script_path]
-            
-            self.output_queue.put(('output', f"執行命令：{' '.join(cmd)}"))
+                cmd = (self.script_path,)
             
             # 設置環境變量
-            env = os.environ.copy()
-            env['PYTHONUNBUFFERED'] = '1'
-            env['PYTHONIOENCODING'] = 'utf-8'
+            env = {**os.environ, 'PYTHONUNBUFFERED': '1', 'PYTHONIOENCODING': 'utf-8'}
+            self._LAUNCH_CACHE[key] = (cmd, env)
+        return self._LAUNCH_CACHE[key]
+    
+    async def _execute_script(self):
+        """在後台執行腳本"""
+        try:
+            cmd, env = self._launch_spec()
+            self._post('output', f"執行命令：{' '.join(cmd)}")
+            
+            # 輸出讀取狀態：解碼器、未換行的緩衝與靜止計時器
+            self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            self._pending = ""
+            self._idle_handle = None
             
-            # 啟動進程
-            self.process = subprocess.Popen(
-                cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=0,
-                universal_newlines=True,
+            # 啟動進程，stdout 數據由事件循環在管道就緒時直接回調 _on_output
+            loop = asyncio.get_running_loop()
+            self.process, protocol = await loop.subprocess_exec(
+                lambda: _ScriptProtocol(self),
+                *cmd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
                 env=env,
                 cwd=os.getcwd()
             )
             
-            # 啟動輸出讀取線程
-            output_thread = threading.Thread(target=self._read_output, daemon=True)
-            output_thread.start()
+            # 等待輸出讀到 EOF 且進程結束，再取得退出碼
+            await protocol.output_closed
+            await protocol.exited
+            exit_code = self.process.get_returncode()
+            self.process.close()
             
-            # 處理用戶輸入
-            while self.is_running and self.process.poll() is None:
-                try:
-                    user_input = self.input_queue.get(timeout=0.1)
-                    if user_input is not None:
-                        # 發送用戶輸入到進程
-                        self.process.stdin.write(user_input + '\n')
-                        self.process.stdin.flush()
-                        self.output_queue.put(('user_input', f">>> {user_input}"))
-                except queue.Empty:
-                    continue
-                except Exception as e:
-                    self.output_queue.put(('error', f"發送輸入錯誤: {str(e)}"))
-                    break
-            
-            # 等待進程結束
-            if self.process:
-                self.process.wait()
-                exit_code = self.process.returncode
-                
-                if exit_code == 0:
-                    self.execution_successful = True
-                    self.output_queue.put(('status', 'success'))
-                else:
-                    self.output_queue.put(('status', f'failed_{exit_code}'))
+            if exit_code == 0:
+                self.execution_successful = True
+                self._post('status', 'success')
+            else:
+                self._post('status', f'failed_{exit_code}')
                     
         except Exception as e:
-            self.output_queue.put(('error', f"執行過程中發生錯誤：{str(e)}"))
-            self.output_queue.put(('status', 'error'))
+            self._post('error', f"執行過程中發生錯誤：{str(e)}")
+            self._post('status', 'error')
         finally:
             self.is_running = False
     
-    def _read_output(self):
-        """讀取進程輸出的線程函數"""
-        buffer = ""
-        last_char_time = time.time()
-        
+    def _write_input(self, user_input):
+        """在事件循環中把用戶輸入寫入進程"""
         try:
-            while self.is_running and self.process and self.process.poll() is None:
-                try:
-                    # 逐字符讀取以便檢測提示符
-                    char = self.process.stdout.read(1)
-                    if char:
-                        buffer += char
-                        last_char_time = time.time()
-                        
-                        # 如果遇到換行符，立即輸出
-                        if char == '\n':
-                            if buffer.strip():
-                                self.output_queue.put(('output', buffer.rstrip()))
-                                # 檢查是否是輸入提示
-                                if self._is_input_prompt(buffer.strip()):
-                                    self.output_queue.put(('prompt', buffer.strip()))
-                            buffer = ""
-                    else:
-                        # 檢查是否有未輸出的提示符（無換行符的情況）
-                        current_time = time.time()
-                        if buffer and (current_time - last_char_time) > 0.3:  # 減少等待時間
-                            # 更積極的提示檢測
-                            buffer_text = buffer.strip()
-                            is_prompt = (
-                                self._is_input_prompt(buffer_text) or 
-                                buffer_text.endswith(':') or 
-                                buffer_text.endswith('\\') or
-                                '預設' in buffer_text or
-                                len(buffer_text) > 10 and not buffer_text.endswith('...')  # 可能是完整提示
-                            )
-                            
-                            if is_prompt:
-                                self.output_queue.put(('output', buffer.rstrip()))
-                                self.output_queue.put(('prompt', buffer.strip()))
-                                buffer = ""
-                                last_char_time = current_time
-                        
-                        time.sleep(0.01)
-                        
-                except Exception as e:
-                    break
+            # 發送用戶輸入到進程
+            self.process.get_pipe_transport(0).write((user_input + '\n').encode('utf-8'))
+            self._post('user_input', f">>> {user_input}")
+        except Exception as e:
+            self._post('error', f"發送輸入錯誤: {str(e)}")
+    
+    def _on_output(self, data):
+        """stdout 數據回調：完整行立即送出，未換行的部分留待靜止檢查"""
+        try:
+            lines = (self._pending + self._decoder.decode(data)).splitlines(True)
+            self._pending = lines.pop() if lines and not lines[-1].endswith(('\n', '\r')) else ""
+            for line in lines:
+                self._queue_line(line)
             
-            # 處理剩餘輸出
-            if buffer.strip():
-                self.output_queue.put(('output', buffer.rstrip()))
+            # 有新數據即重新計時；輸出停在未換行內容上時再檢查是否為提示
+            if self._idle_handle is not None:
+                self._idle_handle.cancel()
+                self._idle_handle = None
+            if self._pending:
+                self._idle_handle = self._loop.call_later(PROMPT_IDLE_SECONDS, self._on_output_idle)
                 
         except Exception as e:
-            self.output_queue.put(('error', f"讀取輸出錯誤: {str(e)}"))
+            self._post('error', f"讀取輸出錯誤: {str(e)}")
+    
+    def _on_output_idle(self):
+        """輸出停在未換行的內容上，通常是 input() 或 print(end="") 的提示"""
+        self._idle_handle = None
+        if self._is_partial_prompt(self._pending):
+            self._post('prompt', self._pending.rstrip())
+            self._pending = ""
+    
+    def _on_output_eof(self):
+        """stdout 關閉：送出解碼器與緩衝中剩餘的內容"""
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        for line in (self._pending + self._decoder.decode(b'', final=True)).splitlines():
+            self._queue_line(line)
+        self._pending = ""
+    
+    def _queue_line(self, line):
+        """把一行輸出送入隊列，輸入提示行以 prompt 消息送出"""
+        text = line.rstrip()
+        if not text.strip():
+            return
+        # 在讀取端判斷一次是否為輸入提示
+        msg_type = 'prompt' if self._is_input_prompt(text) else 'output'
+        self._post(msg_type, text)
+    
+    def _is_partial_prompt(self, text):
+        """判斷靜止的未換行內容是否為等待輸入的提示"""
+        text = text.strip()
+        if not text:
+            return False
+        # 先按提示指示符判斷，與逐行輸出的規則一致
+        if self._is_input_prompt(text) or text.endswith(':') or '預設' in text:
+            return True
+        # 沒有指示符時，較長且不以省略號結尾的內容多半是完整提示
+        return len(text) > 10 and not text.endswith('...')
     
     def _is_input_prompt(self, text):
         """檢查文本是否包含輸入提示"""
-        input_indicators = [
-            '請輸入', '選擇', '確認', '輸入', 'input', 'enter',
-            ': ', '? ', '：', '？', '(y/n)', '[Enter]', '預設:', 
-            '(default)', '(Y/n)', '(y/N)', '>>>', 'choice',
-            '或按Enter', '請選擇', 'Select', 'Choose', '\\', '\\ '
-        ]
-        
-        text_lower = text.lower()
-        
-        # 檢查是否包含輸入指示符
-        has_indicator = any(indicator.lower() in text_lower for indicator in input_indicators)
-        
-        # 特別檢查以 \ 結尾的行（shell續行提示符）
-        if text.strip().endswith('\\'):
-            return True
-            
-        # 檢查是否包含預設值提示格式，如 "(預設: xxx):"
-        if '預設:' in text and ':' in text:
-            return True
-            
-        return has_indicator
+        return _PROMPT_RE.search(text) is not None
     
     def process_output(self):
         """處理輸出隊列"""
+        lines = []
         try:
+            # 在時間預算內盡量清空隊列，輸出行累積後一次插入
+            deadline = time.monotonic() + OUTPUT_DRAIN_BUDGET
             processed_count = 0
-            while processed_count < 10:  # 限制每次處理的消息數量
+            while True:
+                if processed_count % 32 == 31 and time.monotonic() > deadline:
+                    break
                 try:
-                    msg_type, content = self.output_queue.get_nowait()
-                    processed_count += 1
-                    
+                    msg_type, content = self.output_queue.popleft()
+                except IndexError:
+                    break
+                processed_count += 1
+                
+                if msg_type in ('output', 'prompt'):
+                    self._recent_lines.append(content)
+                    # 檢測消息類型並應用樣式
+                    tag = _output_tag(content)
+                    if tag is None and msg_type == 'prompt':
+                        tag = "prompt"
+                    lines.append((content, tag))
                     if msg_type == 'output':
-                        # 檢測消息類型並應用樣式
-                        if any(keyword in content for keyword in ['錯誤', 'ERROR', '❌', 'Error']):
-                            self.append_output(content, "error")
-                        elif any(keyword in content for keyword in ['警告', 'WARNING', '⚠️', 'Warning']):
-                            self.append_output(content, "warning")
-                        elif any(keyword in content for keyword in ['成功', 'SUCCESS', '✅', 'Success']):
-                            self.append_output(content, "success")
-                        elif self._is_input_prompt(content):
-                            self.append_output(content, "prompt")
-                        else:
-                            self.append_output(content)
-                            
-                    elif msg_type == 'user_input':
-                        self.append_output(content, "input")
-                        self.disable_input()
-                        
-                    elif msg_type == 'prompt':
-                        self.update_input_prompt(f"等待輸入: {content}")
-                        self.enable_input()
+                        continue
+                
+                # 其他消息會改變界面狀態，先寫出已累積的輸出以保持順序
+                if lines:
+                    self._insert_lines(lines)
+                    lines = []
                         
-                    elif msg_type == 'status':
-                        if content == 'success':
-                            self.status_var.set("執行完成")
-                            self.append_output("✅ 腳本執行完成", "success")
-                            self._execution_finished()
-                        elif content.startswith('failed_'):
-                            exit_code = content.split('_')[1]
-                            self.status_var.set("執行失敗")
-                            self.append_output(f"❌ 腳本執行失敗 (退出碼: {exit_code})", "error")
-                            self._execution_finished()
-                        elif content == 'error':
-                            self.status_var.set("執行錯誤")
-                            self.append_output("❌ 腳本執行過程中發生錯誤", "error")
-                            self._execution_finished()
-                            
-                    elif msg_type == 'error':
-                        self.append_output(content, "error")
+                if msg_type == 'user_input':
+                    self.append_output(content, "input")
+                    self.disable_input()
+                    
+                elif msg_type == 'prompt':
+                    self.update_input_prompt(f"等待輸入: {content.strip()}")
+                    self.enable_input()
+                    
+                elif msg_type == 'status':
+                    if content == 'success':
+                        self.status_var.set("執行完成")
+                        self.append_output("✅ 腳本執行完成", "success")
+                        self._execution_finished()
+                    elif content.startswith('failed_'):
+                        exit_code = content.split('_')[1]
+                        self.status_var.set("執行失敗")
+                        self.append_output(f"❌ 腳本執行失敗 (退出碼: {exit_code})", "error")
+                        self._execution_finished()
+                    elif content == 'error':
+                        self.status_var.set("執行錯誤")
+                        self.append_output("❌ 腳本執行過程中發生錯誤", "error")
+                        self._execution_finished()
                         
-                except queue.Empty:
-                    break
+                elif msg_type == 'error':
+                    self.append_output(content, "error")
+            
+            if lines:
+                self._insert_lines(lines)
+            if processed_count:
+                self._trim_output()
+                self.output_text.see(tk.END)
+                self.window.update_idletasks()
                     
         except Exception:
             pass
         
-        # 繼續處理隊列
-        if self.is_running or not self.output_queue.empty():
-            self.window.after(100, self.process_output)
+        # 繼續處理隊列：仍有積壓時在空閒時立即續處理；沒有喚醒管道時按間隔輪詢
+        # 先讀運行狀態再檢查隊列：事件循環線程先送出最後的消息才清除 is_running，
+        # 讀到 False 時最後的消息必定已在隊列中，不會在兩次讀取之間漏掉
+        running = self.is_running
+        if self.output_queue:
+            self.window.after_idle(self.process_output)
+        elif running and self._wake_r is None:
+            self.window.after(OUTPUT_POLL_MS, self.process_output)
     
     def send_input(self, event=None):
         """發送用戶輸入"""
@@ -467,8 +604,13 @@ class FinalTerminal:
             self.terminate_script()
             return
         
-        # 將輸入放入隊列
-        self.input_queue.put(user_input if user_input else "")
+        # 交由事件循環寫入進程；腳本已結束時事件循環可能已關閉
+        if self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._write_input, user_input)
+        except RuntimeError:
+            return
         
         # 清空輸入框
         self.input_var.set("")
@@ -495,9 +637,9 @@ class FinalTerminal:
     
     def terminate_script(self):
         """終止腳本"""
-        if self.process and self.process.poll() is None:
+        if self.process and self.process.get_returncode() is None:
             try:
-                self.process.terminate()
+                self._loop.call_soon_threadsafe(self._terminate_process)
                 self.append_output("🛑 用戶終止執行", "warning")
                 self.status_var.set("已終止")
                 self.is_running = False
@@ -506,9 +648,16 @@ class FinalTerminal:
         
         self._execution_finished()
     
+    def _terminate_process(self):
+        """在事件循環中終止進程，進程可能已自行結束"""
+        try:
+            self.process.terminate()
+        except ProcessLookupError:
+            pass
+    
     def close_window(self):
         """關閉窗口"""
-        if self.is_running and self.process and self.process.poll() is None:
+        if self.is_running and self.process and self.process.get_returncode() is None:
             result = messagebox.askyesno(
                 "確認關閉", 
                 "腳本仍在執行中，確定要關閉窗口嗎？\n這將終止腳本執行。",
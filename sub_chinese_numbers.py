@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+中文數字轉換工具
+將標題中的中文數字（如一、十二、二十三、貳）轉為阿拉伯數字，供自然排序使用
+"""
+
+import re
+from functools import lru_cache
+
+# 中文數字對應表
+_CHINESE_DIGITS = {
+    '零': '0', '一': '1', '二': '2', '三': '3', '四': '4', '五': '5',
+    '六': '6', '七': '7', '八': '8', '九': '9', '十': '10',
+    '〇': '0', '壹': '1', '貳': '2', '參': '3', '肆': '4', '伍': '5',
+    '陸': '6', '柒': '7', '捌': '8', '玖': '9', '拾': '10'
+}
+
+# "十X" 模式（如：十一、十二...十九）
+_SHI_X_RE = re.compile(r'十([一二三四五六七八九壹貳參肆伍陸柒捌玖])')
+# "X十Y" 模式（如：二十一、三十五、九十九等）
+_X_SHI_Y_RE = re.compile(r'([一二三四五六七八九壹貳參肆伍陸柒捌玖])十([一二三四五六七八九壹貳參肆伍陸柒捌玖]?)')
+# 單個中文數字一次轉換（替換結果皆為阿拉伯數字，與逐一replace結果相同）
+_DIGIT_TRANS = str.maketrans(_CHINESE_DIGITS)
+
+def _replace_shi_x(match):
+    x = match.group(1)
+    if x in _CHINESE_DIGITS:
+        return '1' + _CHINESE_DIGITS[x]
+    return match.group(0)
+
+def _replace_x_shi_y(match):
+    x = match.group(1)
+    y = match.group(2) if match.group(2) else ''
+    x_digit = _CHINESE_DIGITS.get(x, x)
+    y_digit = _CHINESE_DIGITS.get(y, y) if y else '0'
+    if y:
+        return x_digit + y_digit
+    else:
+        return x_digit + '0'
+
+@lru_cache(maxsize=4096)
+def convert_chinese_numbers_to_digits(text):
+    """將中文數字轉換為阿拉伯數字以便自然排序"""
+    if not isinstance(text, str):
+        return str(text)
+    
+    # 處理複雜的十位數字模式（如：十一、二十三、九十九等）
+    result = _SHI_X_RE.sub(_replace_shi_x, text)
+    result = _X_SHI_Y_RE.sub(_replace_x_shi_y, result)
+    
+    # 處理單獨的 "十"
+    result = result.replace('十', '10')
+    
+    # 處理其他單個中文數字
+    return result.translate(_DIGIT_TRANS)
+
+def convert_chinese_numbers_series(series):
+    """convert_chinese_numbers_to_digits 的向量化版本，對整個字串Series一次處理"""
+    series = series.astype(str)
+    return (series.str.replace(_SHI_X_RE, _replace_shi_x, regex=True)
+                  .str.replace(_X_SHI_Y_RE, _replace_x_shi_y, regex=True)
+                  .str.replace('十', '10', regex=False)
+                  .str.translate(_DIGIT_TRANS))
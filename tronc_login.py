@@ -60,13 +60,23 @@ def save_debug_info(driver, step, success=True):
         print(f'保存調試信息失敗: {e}')
         return None
 
-def login_and_get_cookie():
-    """登入並獲取 cookie"""
-    driver = setup_driver()
-    if not driver:
-        return None
+def login_and_get_cookie(driver=None):
+    """登入並獲取 cookie
+    
+    可傳入既有的 WebDriver 重複使用瀏覽器（省去啟動時間），此時結束後不關閉；
+    未傳入時自行建立並在結束時關閉
+    """
+    own_driver = driver is None
+    if own_driver:
+        driver = setup_driver()
+        if not driver:
+            return None
     
     try:
+        if not own_driver:
+            # 重複使用的瀏覽器先清除舊的登入狀態，確保會出現登入頁面
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        
         print(f'正在訪問登入頁面: {LOGIN_URL}')
         driver.get(LOGIN_URL)
         
@@ -298,7 +308,8 @@ def login_and_get_cookie():
         save_debug_info(driver, 'login_error', False)
         return None
     finally:
-        driver.quit()
+        if own_driver:
+            driver.quit()
 
 def update_config(cookie_string, modules):
     """更新配置文件"""